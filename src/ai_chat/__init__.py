@@ -13,7 +13,7 @@ Main components:
 
 from .chat_handler import ChatHandler
 from .llm_engine import GemmaLLM
-from .data_prep import prepare_data_context
+from .data_prep import DataContext, prepare_data_context
 from .safety_filters import InputValidator, ResponseFilter
 
 __version__ = "1.0.0"
@@ -21,6 +21,7 @@ __version__ = "1.0.0"
 __all__ = [
     "ChatHandler",
     "GemmaLLM",
+    "DataContext",
     "prepare_data_context",
     "InputValidator",
     "ResponseFilter",
@@ -12,12 +12,15 @@ Orchestrates:
 """
 
 from typing import Dict, Any, Tuple, Optional, Callable
-import os
-from datetime import datetime
 from .llm_engine import GemmaLLM
-from .data_prep import prepare_data_context, prepare_chart_context
-from .prompt_templates import build_system_prompt, build_full_prompt, format_query_with_data
-from .safety_filters import InputValidator, ResponseFilter
+from .data_prep import DataContext, prepare_data_context, prepare_chart_context
+from .prompt_templates import (
+    build_system_prompt, build_full_prompt_ids, format_system_turn,
+    format_history_turn, format_query_with_data
+)
+from .safety_filters import (
+    DEFAULT_INPUT_VALIDATOR, DEFAULT_RESPONSE_FILTER, DEFAULT_LOG_FILE, append_log, log_timestamp
+)
 from .code_executor import CodeExecutor
 
 
@@ -44,15 +47,26 @@ class ChatHandler:
             enable_code_execution: Enable LLM code generation for dynamic queries (default True)
         """
         self.llm = GemmaLLM(model_path, verbose=verbose)
-        self.input_validator = InputValidator()
-        self.response_filter = ResponseFilter()
+        self.input_validator = DEFAULT_INPUT_VALIDATOR
+        self.response_filter = DEFAULT_RESPONSE_FILTER
         self.conversation_history = []
         self.verbose = verbose
         self.enable_code_execution = enable_code_execution
         self.code_executor: Optional[CodeExecutor] = None
         
+        # Data context / system prompt are static per uploaded dataset
+        self._context_source = None  # (df_clean, metrics, row count, data_mode)
+        self._data_context: Optional[DataContext] = None
+        self._system_prompt: Optional[str] = None
+        
+        # Prompt token ids for standard generation, valid for one loaded model:
+        # (system prompt, its ids) and {(user, assistant): ids} per history turn
+        self._ids_model = None
+        self._system_ids: Optional[Tuple[str, list]] = None
+        self._turn_ids: Dict[Tuple[str, str], list] = {}
+        
         # Configure logging (consolidated with InputValidator)
-        self.log_file = os.path.join(os.getcwd(), 'logs', 'queries.log')
+        self.log_file = DEFAULT_LOG_FILE
         
         if verbose:
             print("🤖 ChatHandler initialized")
@@ -137,11 +151,8 @@ class ChatHandler:
         if self.verbose:
             print(f"✅ Query accepted: {user_query[:50]}...")
         
-        # 1. Build data context
-        data_context = prepare_data_context(df_clean, metrics, data_mode)
-        
-        # 2. Build system prompt
-        system_prompt = build_system_prompt(data_context, data_mode)
+        # 1-2. Build data context and system prompt (cached per dataset)
+        data_context, system_prompt = self._get_context(df_clean, metrics, data_mode)
         
         # 3. Format user query (no CSV - use only schema + pre-computed metrics)
         # CSV removed for performance - LLM now uses pre-computed metrics in system prompt
@@ -150,16 +161,10 @@ class ChatHandler:
         # 4. Prepare chart context (multimodal)
         chart_context = prepare_chart_context(chart_path)
         
-        # 5. Build full prompt
-        full_prompt = build_full_prompt(
-            system_prompt,
-            user_query_formatted,
-            self.conversation_history
-        )
-        
-        # Add chart note if available
+        # 5. Full prompt is built as token ids at generation time (see
+        # _generate_standard); the chart note belongs to the user's turn
         if chart_context:
-            full_prompt += f"\n\n{chart_context['note']}\n"
+            user_query_formatted += f"\n\n{chart_context['note']}"
         
         # 6. Check if we should use code execution for this query
         use_code_exec = self.enable_code_execution and self.code_executor and self._should_use_code_execution(user_query)
@@ -185,12 +190,7 @@ class ChatHandler:
                 )
             else:
                 # Standard LLM generation
-                raw_response = self.llm.generate(
-                    full_prompt,
-                    max_tokens=1024,
-                    temperature=0.7,
-                    top_p=0.9
-                )
+                raw_response = self._generate_standard(system_prompt, user_query_formatted)
         except Exception as e:
             error_msg = f"I encountered an error generating a response: {str(e)}"
             
@@ -253,6 +253,86 @@ class ChatHandler:
         
         return safe_response, metadata
     
+    def _get_context(
+        self,
+        df_clean,
+        metrics: Dict[str, Any],
+        data_mode: str
+    ) -> Tuple[DataContext, str]:
+        """
+        Get data context and system prompt, rebuilding only when the data changes.
+        
+        Args:
+            df_clean: Cleaned DataFrame
+            metrics: Metrics dictionary
+            data_mode: 'scheduled' or 'walkin'
+            
+        Returns:
+            (data_context: DataContext, system_prompt: str)
+        """
+        # Holding the objects themselves (not their id()s) means a new upload
+        # can never be mistaken for a freed frame that reused its address
+        source = self._context_source
+        if not (
+            source is not None
+            and source[0] is df_clean
+            and source[1] is metrics
+            and source[2] == len(df_clean)
+            and source[3] == data_mode
+        ):
+            self._data_context = prepare_data_context(df_clean, metrics, data_mode)
+            self._system_prompt = build_system_prompt(self._data_context, data_mode)
+            self._context_source = (df_clean, metrics, len(df_clean), data_mode)
+        
+        return self._data_context, self._system_prompt
+    
+    def _generate_standard(self, system_prompt: str, user_query: str) -> str:
+        """
+        Answer from the system prompt, recent history and the user's turn.
+        
+        The prompt has build_full_prompt's Gemma turn layout but is assembled
+        as token ids and sent as a raw completion (GemmaLLM.generate_from_tokens),
+        so no chat template is wrapped around it. Only the new user turn is
+        tokenized; system and history ids are reused until the model changes.
+        
+        Args:
+            system_prompt: System prompt for the current dataset
+            user_query: User's turn (question plus any chart note)
+            
+        Returns:
+            str: Raw model response
+        """
+        # Ids only hold for the tokenizer that produced them
+        model = self.llm.load_model()
+        if model is not self._ids_model:
+            self._ids_model = model
+            self._system_ids = None
+            self._turn_ids = {}
+        
+        if self._system_ids is None or self._system_ids[0] != system_prompt:
+            self._system_ids = (system_prompt, self.llm.tokenize(format_system_turn(system_prompt)))
+        
+        # Last 3 turns; ids of turns that dropped out of the window are released
+        turn_ids = {}
+        history_ids = []
+        for turn in self.conversation_history[-3:]:
+            key = (turn['user'], turn['assistant'])
+            ids = self._turn_ids.get(key)
+            if ids is None:
+                ids = self.llm.tokenize(format_history_turn(turn))
+            turn_ids[key] = ids
+            history_ids.append(ids)
+        self._turn_ids = turn_ids
+        
+        prompt_ids = build_full_prompt_ids(self.llm.tokenize, self._system_ids[1], user_query, history_ids)
+        
+        return self.llm.generate_from_tokens(
+            prompt_ids,
+            max_tokens=1024,
+            temperature=0.7,
+            top_p=0.9
+        )
+    
     def _should_use_code_execution(self, user_query: str) -> bool:
         """
         Determine if a query requires dynamic code execution.
@@ -285,7 +365,7 @@ class ChatHandler:
         user_query: str,
         df_clean,
         metrics: Dict[str, Any],
-        data_context: Dict[str, Any]
+        data_context: DataContext
     ) -> str:
         """
         Handle query using code generation and execution.
@@ -311,8 +391,8 @@ class ChatHandler:
         success, result, error = self.code_executor.safe_execute_query(
             user_query=user_query,
             llm_generate_fn=self.llm.generate,
-            columns=data_context['columns'],
-            metrics=data_context['key_metrics']
+            columns=data_context.columns,
+            metrics=data_context.key_metrics
         )
         
         if not success:
@@ -320,8 +400,7 @@ class ChatHandler:
             if self.verbose:
                 print(f"⚠️ Code execution failed, falling back to standard LLM: {error}")
             system_prompt = build_system_prompt(data_context, 'scheduled' if 'booking' in metrics else 'walkin')
-            full_prompt = build_full_prompt(system_prompt, user_query, self.conversation_history)
-            return self.llm.generate(full_prompt, max_tokens=1024, temperature=0.7, top_p=0.9)
+            return self._generate_standard(system_prompt, user_query)
         
         # 2. Format result using LLM
         format_prompt = f"""You are a Writing Center Data Analyst.
@@ -374,7 +453,7 @@ Focus on what the number means in context."""
             error_details: Error details (if applicable)
         """
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = log_timestamp()
             log_entry = f"[{timestamp}] RESPONSE\n"
             
             if error:
@@ -391,11 +470,8 @@ Focus on what the number means in context."""
             log_entry += f"Response: \"{response}\"\n"
             log_entry += "=" * 50 + "\n"
             
-            # Ensure logs directory exists
-            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-            
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+            # Shared log writer keeps entries ordered with InputValidator.log_query
+            append_log(self.log_file, log_entry)
         except Exception as e:
             # Silently fail on logging errors to not break the app
             print(f"Warning: Failed to log response: {e}")
@@ -6,7 +6,29 @@ Converts cleaned DataFrames and metrics into formats suitable for LLM prompts.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from .prompt_templates import format_schema_info, format_key_metrics_enhanced
+
+
+@dataclass(frozen=True, slots=True)
+class DataContext:
+    """
+    LLM context for one uploaded dataset (built by prepare_data_context).
+    
+    The data is static per upload, so the schema and key-metric prompt
+    sections are formatted once here instead of on every chat turn.
+    """
+    data_mode: str
+    total_records: int
+    date_range: str
+    columns: List[str]
+    data_types: Dict[str, str]
+    value_ranges: Dict[str, Dict[str, Any]]
+    key_metrics: Dict[str, Any]
+    data_sample: str
+    schema_info_str: str
+    key_metrics_str: str
 
 
 def prepare_data_context(
@@ -14,7 +36,7 @@ def prepare_data_context(
     metrics: Dict[str, Any],
     data_mode: str = 'scheduled',
     max_rows: int = 5
-) -> Dict[str, Any]:
+) -> DataContext:
     """
     Prepare data context for LLM prompt.
     
@@ -28,7 +50,7 @@ def prepare_data_context(
         max_rows: Maximum number of rows to include in sample (kept minimal)
         
     Returns:
-        Dict with prepared context:
+        DataContext with:
             - data_mode: Type of data
             - total_records: Total number of records
             - date_range: Date range string
@@ -37,6 +59,8 @@ def prepare_data_context(
             - value_ranges: Min/max for numeric columns
             - key_metrics: Dict of key metrics (PRE-COMPUTED)
             - data_sample: Tiny sample (5 rows max, for understanding structure)
+            - schema_info_str: Schema section of the system prompt (pre-formatted)
+            - key_metrics_str: Key metrics section of the system prompt (pre-formatted)
     """
     
     # Basic info
@@ -56,16 +80,19 @@ def prepare_data_context(
     # Prepare tiny data sample (just for structure understanding, not for counting)
     data_sample = prepare_data_sample(df_clean, max_rows)
     
-    return {
-        'data_mode': data_mode,
-        'total_records': total_records,
-        'date_range': date_range,
-        'columns': columns,
-        'data_types': data_types,
-        'value_ranges': value_ranges,
-        'key_metrics': key_metrics,
-        'data_sample': data_sample
-    }
+    return DataContext(
+        data_mode=data_mode,
+        total_records=total_records,
+        date_range=date_range,
+        columns=columns,
+        data_types=data_types,
+        value_ranges=value_ranges,
+        key_metrics=key_metrics,
+        data_sample=data_sample,
+        # Format the static prompt sections once per dataset, not once per turn
+        schema_info_str=format_schema_info(columns, data_types, value_ranges),
+        key_metrics_str=format_key_metrics_enhanced(key_metrics)
+    )
 
 
 def get_date_range(df: pd.DataFrame) -> str:
@@ -4,8 +4,9 @@ GemmaLLM class - Wrapper for Gemma 3 4B using llama-cpp-python.
 
 import os
 import psutil
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from pathlib import Path
+from .setup_model import detect_gpu
 
 try:
     from llama_cpp import Llama
@@ -47,24 +48,9 @@ class GemmaLLM:
         ram_available_gb = ram_info.available / (1024**3)
         ram_sufficient = ram_available_gb >= 8.0
         cpu_threads = os.cpu_count() or 4
-        gpu_available = False
-        gpu_acceleration = "None (CPU only)"
-        
-        try:
-            import torch
-            if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-                gpu_available = True
-                gpu_acceleration = "Metal (MPS)"
-        except ImportError:
-            pass
-        
-        try:
-            import torch
-            if torch.cuda.is_available():
-                gpu_available = True
-                gpu_acceleration = "CUDA"
-        except ImportError:
-            pass
+        gpu = detect_gpu()
+        gpu_available = gpu is not None
+        gpu_acceleration = gpu[0] if gpu else "None (CPU only)"
         
         return {
             'ram_gb': round(ram_gb, 1),
@@ -136,6 +122,61 @@ class GemmaLLM:
         
         return response['choices'][0]['message']['content'].strip()
     
+    def tokenize(self, text: str) -> List[int]:
+        """
+        Tokenize text with the model's tokenizer.
+        
+        Turn markers such as <start_of_turn> are parsed as special tokens;
+        no BOS token is added.
+        
+        Args:
+            text: Text to tokenize
+            
+        Returns:
+            List of token ids
+        """
+        model = self.load_model()
+        return model.tokenize(text.encode('utf-8'), add_bos=False, special=True)
+    
+    def generate_from_tokens(self, prompt_tokens: List[int], max_tokens: int = 1024,
+                             temperature: float = 0.7, top_p: float = 0.9,
+                             top_k: int = 40, stop: Optional[list] = None) -> str:
+        """
+        Generate response from an already-tokenized prompt.
+        
+        Runs a raw completion, so no chat template is applied: the prompt
+        must already hold the Gemma turn markup and end with an open model
+        turn (see build_full_prompt_ids). Generation stops at the model's
+        own <end_of_turn>, rather than generate_chat's "<end_of_turn>model\n",
+        which only shows up when the template wraps a marked-up prompt.
+        
+        Args:
+            prompt_tokens: Prompt token ids (without BOS)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0.0-1.0)
+            top_p: Nucleus sampling parameter
+            top_k: Top-k sampling parameter
+            stop: Stop tokens
+            
+        Returns:
+            Generated response text
+        """
+        model = self.load_model()
+        
+        if stop is None:
+            stop = ["<end_of_turn>", "END_OF_RESPONSE"]
+        
+        response = model.create_completion(
+            prompt=[model.token_bos()] + list(prompt_tokens),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            stop=stop
+        )
+        
+        return response['choices'][0]['text'].strip()
+    
     def generate(self, prompt: str, max_tokens: int = 1024,
                 temperature: float = 0.7, top_p: float = 0.9,
                 top_k: int = 40, stop: Optional[list] = None,
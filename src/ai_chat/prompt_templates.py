@@ -4,8 +4,25 @@ Prompt templates for Gemma 3 4B AI Chat Assistant.
 Defines system prompts for Writing Center Data Analyst persona.
 """
 
+from types import MappingProxyType
+from typing import Callable, List
+
 # System prompts
-SCHEDULED_SYSTEM_PROMPT = """You are a Writing Center Data Analyst specializing in interpreting student reservation trends.
+# Rendered with f-strings rather than str.format() so the runtime doesn't parse
+# a format spec on every chat turn.
+def render_scheduled_system_prompt(
+    total_records,
+    date_range: str,
+    schema_info: str,
+    key_metrics: str,
+    daily_patterns: str,
+    monthly_patterns: str,
+    semester_trends: str,
+    daily_patterns_by_semester: str,
+    semester_year_comparisons: str
+) -> str:
+    """Render the scheduled-session system prompt."""
+    return f"""You are a Writing Center Data Analyst specializing in interpreting student reservation trends.
 
 IMPORTANT: You have TWO WAYS to answer questions about Writing Studio data:
 
@@ -92,7 +109,15 @@ YEAR-OVER-YEAR COMPARISONS (semester trends across years):
 Respond conversationally but professionally. Focus on patterns and trends."""
 
 
-WALKIN_SYSTEM_PROMPT = """You are a Writing Center Data Analyst specializing in walk-in session trends.
+def render_walkin_system_prompt(
+    total_records,
+    date_range: str,
+    schema_info: str,
+    key_metrics: str,
+    daily_patterns: str
+) -> str:
+    """Render the walk-in system prompt."""
+    return f"""You are a Writing Center Data Analyst specializing in walk-in session trends.
 
 IMPORTANT: You have TWO WAYS to answer questions about Writing Studio data:
 
@@ -159,45 +184,42 @@ DAILY PATTERNS (busiest/slowest dates):
 Respond conversationally but professionally. Focus on patterns and trends."""
 
 
-def build_system_prompt(data_context: dict, data_mode: str) -> str:
+def build_system_prompt(data_context, data_mode: str) -> str:
     """
     Build system prompt from data context.
     
-    OPTIMIZED: Formats schema info and pre-computed metrics for LLM.
+    OPTIMIZED: Schema info and key metrics are pre-formatted on the
+    DataContext, so only the small pattern sections are formatted here.
     
     Args:
-        data_context: Dict from prepare_data_context
+        data_context: DataContext from prepare_data_context
         data_mode: 'scheduled' or 'walkin'
         
     Returns:
         str: Formatted system prompt
     """
-    schema_info = format_schema_info(data_context)
-    key_metrics = format_key_metrics_enhanced(data_context['key_metrics'])
-    daily_patterns = format_daily_patterns(data_context['key_metrics'])
-    monthly_patterns = format_monthly_patterns(data_context['key_metrics'])
-    semester_trends = format_semester_trends(data_context['key_metrics'])
-    daily_patterns_by_semester = format_daily_patterns_by_semester(data_context['key_metrics'])
-    semester_year_comparisons = format_semester_year_comparisons(data_context['key_metrics'])
+    metrics = data_context.key_metrics
+    daily_patterns = format_daily_patterns(metrics)
     
     if data_mode == 'scheduled':
-        return SCHEDULED_SYSTEM_PROMPT.format(
-            total_records=data_context['total_records'],
-            date_range=data_context['date_range'],
-            schema_info=schema_info,
-            key_metrics=key_metrics,
+        # Monthly/semester sections only appear in the scheduled prompt
+        return render_scheduled_system_prompt(
+            total_records=data_context.total_records,
+            date_range=data_context.date_range,
+            schema_info=data_context.schema_info_str,
+            key_metrics=data_context.key_metrics_str,
             daily_patterns=daily_patterns,
-            monthly_patterns=monthly_patterns,
-            semester_trends=semester_trends,
-            daily_patterns_by_semester=daily_patterns_by_semester,
-            semester_year_comparisons=semester_year_comparisons
+            monthly_patterns=format_monthly_patterns(metrics),
+            semester_trends=format_semester_trends(metrics),
+            daily_patterns_by_semester=format_daily_patterns_by_semester(metrics),
+            semester_year_comparisons=format_semester_year_comparisons(metrics)
         )
     else:
-        return WALKIN_SYSTEM_PROMPT.format(
-            total_records=data_context['total_records'],
-            date_range=data_context['date_range'],
-            schema_info=schema_info,
-            key_metrics=key_metrics,
+        return render_walkin_system_prompt(
+            total_records=data_context.total_records,
+            date_range=data_context.date_range,
+            schema_info=data_context.schema_info_str,
+            key_metrics=data_context.key_metrics_str,
             daily_patterns=daily_patterns
         )
 
@@ -378,7 +400,7 @@ def format_semester_year_comparisons(metrics: dict) -> str:
     return "\n".join(lines) if lines else "No year-over-year comparisons available"
 
 
-def format_schema_info(data_context: dict) -> str:
+def format_schema_info(columns: list, data_types: dict, value_ranges: dict) -> str:
     """
     Format data schema information for LLM.
     
@@ -387,21 +409,18 @@ def format_schema_info(data_context: dict) -> str:
     lines = []
     
     # Column names
-    columns = data_context.get('columns', [])
     if columns:
         lines.append("Columns:")
         for col in columns:
             lines.append(f"  - {col}")
     
     # Data types
-    data_types = data_context.get('data_types', {})
     if data_types:
         lines.append("\nData Types:")
         for col, dtype in data_types.items():
             lines.append(f"  - {col}: {dtype}")
     
     # Value ranges (helpful for understanding numeric scales)
-    value_ranges = data_context.get('value_ranges', {})
     if value_ranges:
         lines.append("\nValue Ranges (samples for understanding structure):")
         for col, range_info in list(value_ranges.items())[:10]:  # Limit to 10 columns
@@ -415,6 +434,62 @@ def format_schema_info(data_context: dict) -> str:
     return "\n".join(lines)
 
 
+# Helpful descriptions for common metrics (read-only, built once at import)
+METRIC_DESCRIPTIONS = MappingProxyType({
+    'avg_booking_lead_time': '(average days between booking and appointment)',
+    'avg_satisfaction': '(student satisfaction rating)',
+    'no_show_rate': '(percentage of students who missed appointments)',
+    'avg_duration': '(average session length in minutes)',
+    'avg_duration_minutes': '(average session length in minutes)',
+    'unique_students': '(distinct students who had sessions)',
+    'unique_tutors': '(distinct tutors who conducted sessions)',
+    'total_sessions': '(total number of appointments)',
+    'total_walkins': '(total number of walk-in sessions)',
+    'unique_consultants': '(distinct consultants who worked with students)',
+    'avg_duration_completed': '(average completed session length in minutes)',
+    'avg_duration_checkin': '(average check-in session length in minutes)',
+})
+
+# Categories formatted by their own sections of the prompt
+_SEPARATELY_FORMATTED = frozenset({'daily_patterns', 'monthly_patterns', 'semester_trends'})
+
+
+def _format_metric_value(key, value) -> str:
+    """Format a metric value with appropriate precision."""
+    if isinstance(value, float):
+        # Use 1 decimal for rates/percentages, 2 for everything else
+        key_lower = key.lower()
+        return f"{value:.1f}" if 'rate' in key_lower or 'pct' in key_lower else f"{value:.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+
+def _iter_category_lines(metrics: dict):
+    """Yield prompt lines for the nested metric categories."""
+    for category, cat_metrics in metrics.items():
+        if isinstance(cat_metrics, dict):
+            # Skip the special categories we format separately
+            if category in _SEPARATELY_FORMATTED:
+                continue
+            
+            yield f"\n{category.upper()}:"
+            for metric_name, metric_value in cat_metrics.items():
+                if isinstance(metric_value, (int, float, str)):
+                    desc = METRIC_DESCRIPTIONS.get(metric_name, '')
+                    yield f"  - {metric_name}: {_format_metric_value(metric_name, metric_value)} {desc}"
+                elif isinstance(metric_value, dict):
+                    yield f"  - {metric_name}:"
+                    yield from (
+                        f"      {sub_key}: {_format_metric_value(sub_key, sub_value)}"
+                        for sub_key, sub_value in metric_value.items()
+                    )
+        elif isinstance(cat_metrics, (int, float, str)):
+            # Top-level simple metrics
+            desc = METRIC_DESCRIPTIONS.get(category, '')
+            yield f"- {category}: {_format_metric_value(category, cat_metrics)} {desc}"
+
+
 def format_key_metrics_enhanced(metrics: dict) -> str:
     """
     Format key metrics for display in prompt with clear descriptions.
@@ -423,22 +498,6 @@ def format_key_metrics_enhanced(metrics: dict) -> str:
     """
     lines = []
     
-    # Add helpful descriptions for common metrics
-    descriptions = {
-        'avg_booking_lead_time': '(average days between booking and appointment)',
-        'avg_satisfaction': '(student satisfaction rating)',
-        'no_show_rate': '(percentage of students who missed appointments)',
-        'avg_duration': '(average session length in minutes)',
-        'avg_duration_minutes': '(average session length in minutes)',
-        'unique_students': '(distinct students who had sessions)',
-        'unique_tutors': '(distinct tutors who conducted sessions)',
-        'total_sessions': '(total number of appointments)',
-        'total_walkins': '(total number of walk-in sessions)',
-        'unique_consultants': '(distinct consultants who worked with students)',
-        'avg_duration_completed': '(average completed session length in minutes)',
-        'avg_duration_checkin': '(average check-in session length in minutes)',
-    }
-    
     # Format hourly location patterns (NEW - critical for location/time questions)
     hourly_location = metrics.get('hourly_location', {})
     if hourly_location:
@@ -494,42 +553,8 @@ def format_key_metrics_enhanced(metrics: dict) -> str:
             for location, rate in completion_rate.items():
                 lines.append(f"    - {location}: {rate}%")
     
-    def format_value(key, value):
-        """Format a metric value with appropriate precision."""
-        if isinstance(value, (int, float)):
-            if isinstance(value, float):
-                # Use 1 decimal for rates/percentages, 2 for averages
-                if 'rate' in key.lower() or 'pct' in key.lower():
-                    return f"{value:.1f}"
-                elif key.startswith('avg'):
-                    return f"{value:.2f}"
-                else:
-                    return f"{value:.2f}"
-            else:
-                return f"{value:,}"
-        else:
-            return str(value)
-    
     # If metrics is from the new structure (nested dicts from calculate_all_metrics)
-    for category, cat_metrics in metrics.items():
-        if isinstance(cat_metrics, dict):
-            # Skip the special categories we format separately
-            if category in ['daily_patterns', 'monthly_patterns', 'semester_trends']:
-                continue
-            
-            lines.append(f"\n{category.upper()}:")
-            for metric_name, metric_value in cat_metrics.items():
-                if isinstance(metric_value, (int, float, str)):
-                    desc = descriptions.get(metric_name, '')
-                    lines.append(f"  - {metric_name}: {format_value(metric_name, metric_value)} {desc}")
-                elif isinstance(metric_value, dict):
-                    lines.append(f"  - {metric_name}:")
-                    for sub_key, sub_value in metric_value.items():
-                        lines.append(f"      {sub_key}: {format_value(sub_key, sub_value)}")
-        elif isinstance(cat_metrics, (int, float, str)):
-            # Top-level simple metrics
-            desc = descriptions.get(category, '')
-            lines.append(f"- {category}: {format_value(category, cat_metrics)} {desc}")
+    lines.extend(_iter_category_lines(metrics))
     
     if not lines:
         # Fallback for simple flat metrics structure
@@ -537,15 +562,33 @@ def format_key_metrics_enhanced(metrics: dict) -> str:
             if isinstance(value, dict):
                 lines.append(f"{key}:")
                 for k, v in value.items():
-                    desc = descriptions.get(k, '')
-                    lines.append(f"  - {k}: {format_value(k, v)} {desc}")
+                    desc = METRIC_DESCRIPTIONS.get(k, '')
+                    lines.append(f"  - {k}: {_format_metric_value(k, v)} {desc}")
             elif isinstance(value, (int, float, str)):
-                desc = descriptions.get(key, '')
-                lines.append(f"- {key}: {format_value(key, value)} {desc}")
+                desc = METRIC_DESCRIPTIONS.get(key, '')
+                lines.append(f"- {key}: {_format_metric_value(key, value)} {desc}")
     
     return "\n".join(lines)
 
 
+def format_system_turn(system_prompt: str) -> str:
+    """Format the system prompt as the opening user turn."""
+    return f"<start_of_turn>user\n{system_prompt}<end_of_turn>\n"
+
+
+def format_history_turn(turn: dict) -> str:
+    """Format one previous exchange (model reply, then the user message)."""
+    return (
+        f"<start_of_turn>model\n{turn['assistant']}<end_of_turn>\n"
+        f"<start_of_turn>user\n{turn['user']}<end_of_turn>\n"
+    )
+
+
+def format_user_turn(user_query: str) -> str:
+    """Format the current user query and open the model's turn."""
+    return f"<start_of_turn>user\n{user_query}<end_of_turn>\n<start_of_turn>model\n"
+
+
 def build_full_prompt(
     system_prompt: str,
     user_query: str,
@@ -562,20 +605,52 @@ def build_full_prompt(
     Returns:
         str: Full formatted prompt
     """
-    # Start with system prompt
-    full_prompt = f"<start_of_turn>user\n{system_prompt}<end_of_turn>\n"
+    # Collect turns and join once instead of repeated += reallocation
+    parts = [format_system_turn(system_prompt)]
     
     # Add conversation history (last 3 turns)
     if conversation_history:
-        for turn in conversation_history[-3:]:
-            full_prompt += f"<start_of_turn>model\n{turn['assistant']}<end_of_turn>\n"
-            full_prompt += f"<start_of_turn>user\n{turn['user']}<end_of_turn>\n"
+        parts.extend(format_history_turn(turn) for turn in conversation_history[-3:])
+    
+    # Add current query
+    parts.append(format_user_turn(user_query))
+    
+    return "".join(parts)
+
+
+def build_full_prompt_ids(
+    tokenize: Callable[[str], List[int]],
+    system_ids: List[int],
+    user_query: str,
+    history_ids: List[List[int]] = None
+) -> List[int]:
+    """
+    Build the full prompt directly as token ids.
+    
+    Same layout as build_full_prompt, but only the new user turn is
+    tokenized: the caller keeps the ids of the system turn and of each
+    history turn (format_history_turn) and passes them in. The unchanged
+    system prefix also lets llama.cpp reuse its KV cache between turns.
+    
+    Args:
+        tokenize: Function converting text to token ids (no BOS)
+        system_ids: Token ids of format_system_turn(system_prompt)
+        user_query: Current user question
+        history_ids: Token ids of each previous turn to include, oldest first
+        
+    Returns:
+        list: Prompt token ids
+    """
+    ids = list(system_ids)
+    
+    # Add conversation history
+    for turn_ids in history_ids or []:
+        ids.extend(turn_ids)
     
     # Add current query
-    full_prompt += f"<start_of_turn>user\n{user_query}<end_of_turn>\n"
-    full_prompt += "<start_of_turn>model\n"
+    ids.extend(tokenize(format_user_turn(user_query)))
     
-    return full_prompt
+    return ids
 
 
 def format_query_with_data(user_query: str, csv_data: str = None) -> str:
@@ -5,12 +5,112 @@ Provides fast, flexible querying capabilities for ad-hoc data questions.
 DuckDB can query pandas DataFrames directly in-memory for optimal performance.
 """
 
+import os
+import copy
+import functools
+import inspect
+from collections import OrderedDict
 import duckdb
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional, List
+import pyarrow as pa
+from typing import Dict, Any, Optional, List, Tuple
 import re
 
 
+# Helper columns added by QueryEngine._add_derived_columns (hidden from SELECT * results)
+DERIVED_COLUMNS = ('_date', '_hour', '_dow', '_month', '_duration_min')
+
+# Low-cardinality filter columns stored dictionary-encoded in the Arrow table
+DICTIONARY_COLUMNS = ('Semester_Label', 'Location', 'Session_Type')
+
+# Aggregations that may be substituted into SQL (identifiers can't be bound)
+ALLOWED_AGGREGATIONS = frozenset({'AVG', 'SUM', 'COUNT', 'MEDIAN', 'MIN', 'MAX'})
+
+# Maximum number of query results kept per QueryEngine
+RESULT_CACHE_SIZE = 128
+
+# Aggregations compare_semesters can compute from per-semester sums/counts
+NUMPY_AGGREGATIONS = frozenset({'AVG', 'SUM', 'COUNT'})
+
+# WHERE clauses for the common filters, keyed by (has_semester, has_location)
+WHERE_CLAUSES = {
+    (False, False): "",
+    (True, False): "WHERE Semester_Label = ?",
+    (False, True): "WHERE Location = ?",
+    (True, True): "WHERE Semester_Label = ? AND Location = ?",
+}
+
+# Fully-formed sessions_by_date queries, keyed by (has_semester, has_location, ascending)
+SESSIONS_BY_DATE_SQL = {
+    (has_semester, has_location, ascending): f"""
+            SELECT 
+                CAST(_date AS DATE) as date,
+                COUNT(*) as session_count
+            FROM df
+            {where_clause}
+            GROUP BY _date
+            ORDER BY session_count {'ASC' if ascending else 'DESC'}
+            LIMIT ?
+        """
+    for (has_semester, has_location), where_clause in WHERE_CLAUSES.items()
+    for ascending in (False, True)
+}
+
+
+def _freeze(value):
+    """Convert a call argument into a hashable cache-key component."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _cached(method):
+    """
+    Memoize a QueryEngine method in the engine's LRU result cache.
+    
+    Every query is a pure function of the (fixed) DataFrame and the call
+    arguments, so repeated chat questions skip DuckDB entirely. Arguments
+    are normalized through the method signature so positional and keyword
+    calls share entries. Cached DataFrames/dicts are returned as copies so
+    callers can't mutate the cached result.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(
+            (name, _freeze(value)) for name, value in bound.arguments.items() if name != 'self'
+        )
+        
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable argument - run uncached
+            return method(self, *args, **kwargs)
+        
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            result = self._cache[key]
+        else:
+            result = method(self, *args, **kwargs)
+            self._cache[key] = result
+            if len(self._cache) > RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        
+        if isinstance(result, pd.DataFrame):
+            return result.copy(deep=False)
+        if isinstance(result, dict):
+            return copy.deepcopy(result)
+        return result
+    
+    return wrapper
+
+
 class QueryEngine:
     """
     Execute safe, parameterized SQL queries on session data using DuckDB.
@@ -22,46 +122,194 @@ class QueryEngine:
     - Nearly identical SQL syntax to SQLite
     """
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, threads: Optional[int] = None):
         """
         Initialize query engine with DataFrame.
         
         Args:
             df: Cleaned pandas DataFrame with session data
+            threads: DuckDB worker threads (default: all CPU cores)
+            
+        Raises:
+            RuntimeError: If the DataFrame can't be registered with DuckDB
         """
         self.df = df
-        self.registered = False
         
-        # Register DataFrame with DuckDB
+        # Private in-memory connection: values are bound as prepared-statement
+        # parameters, and separate engines never overwrite each other's 'df'
+        self.con = duckdb.connect(':memory:')
+        self.con.execute(f"PRAGMA threads={int(threads or os.cpu_count() or 4)}")
+        
+        query_df = self._add_derived_columns(df)
+        derived = [col for col in DERIVED_COLUMNS if col in query_df.columns]
+        self._select_all = f"* EXCLUDE ({', '.join(derived)})" if derived else "*"
+        
+        # Only the uploaded data's own columns may be used as metric identifiers
+        self.allowed_columns = frozenset(df.columns)
+        
+        # LRU cache of query results (see _cached)
+        self._cache: OrderedDict = OrderedDict()
+        
+        # Semester labels factorized once for the NumPy aggregation path
+        if 'Semester_Label' in df.columns:
+            codes, levels = pd.factorize(df['Semester_Label'])
+            self._semester_codes = codes
+            self._semester_index = {label: i for i, label in enumerate(levels)}
+        else:
+            self._semester_codes = None
+            self._semester_index = {}
+        self._group_stats_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        
+        # Register with DuckDB as an Arrow table; an engine without a table is unusable
         try:
-            duckdb.register('df', df)
-            self.registered = True
+            self._table = self._to_arrow(query_df)
+            self.con.register('df', self._table)
         except Exception as e:
-            print(f"Warning: Could not register DataFrame with DuckDB: {e}")
+            self.con.close()
+            raise RuntimeError(f"Could not register DataFrame with DuckDB: {e}") from e
     
     def execute_query(self, query_template: str, params: Dict[str, Any]) -> pd.DataFrame:
         """
         Execute a parameterized SQL query.
         
         Args:
-            query_template: SQL query template with {param} placeholders
-            params: Dictionary of parameters to fill in
+            query_template: SQL query with $name placeholders (bound by DuckDB)
+            params: Dictionary of parameter values keyed by placeholder name
             
         Returns:
             DataFrame with query results
         """
-        if not self.registered:
-            raise RuntimeError("DataFrame not registered with DuckDB")
+        try:
+            return self._fetch_df(query_template, params)
+        except Exception as e:
+            raise RuntimeError(f"Query execution failed: {e}\nQuery: {query_template}")
+    
+    def close(self):
+        """Close the DuckDB connection."""
+        self.con.close()
+        self.clear_cache()
+    
+    def clear_cache(self):
+        """Drop all cached query results."""
+        self._cache.clear()
+    
+    def _fetch_df(self, query: str, params=None) -> pd.DataFrame:
+        """Run a query and return the result as a DataFrame (multi-row results)."""
+        return self.con.execute(query, params).fetch_df()
+    
+    def _fetch_one(self, query: str, params=None) -> Optional[tuple]:
+        """Run a query and return its first row as a tuple of Python scalars."""
+        return self.con.execute(query, params).fetchone()
+    
+    def _fetch_scalar(self, query: str, params=None) -> Any:
+        """Run a query and return the first column of its first row."""
+        row = self._fetch_one(query, params)
+        return row[0] if row is not None else None
+    
+    @staticmethod
+    def _to_arrow(df: pd.DataFrame):
+        """
+        Convert the DataFrame to an Arrow table for DuckDB to scan.
         
-        # Fill in parameters (simple string substitution for templates)
-        query = query_template.format(**params)
+        Arrow columns skip the Python object layer that pandas object-dtype
+        string columns go through, and the low-cardinality filter columns
+        are dictionary-encoded so WHERE Semester_Label = ? / Location = ?
+        compare dictionary codes rather than strings.
         
+        Returns the original DataFrame if it can't be converted (e.g.
+        object columns with mixed types).
+        """
         try:
-            result = duckdb.query(query).df()
-            return result
-        except Exception as e:
-            raise RuntimeError(f"Query execution failed: {e}\nQuery: {query}")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return df
+        
+        for name in DICTIONARY_COLUMNS:
+            index = table.schema.get_field_index(name)
+            if index == -1:
+                continue
+            field_type = table.schema.field(index).type
+            if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+                table = table.set_column(index, name, table.column(name).dictionary_encode())
+        
+        return table
+    
+    @staticmethod
+    def _add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add precomputed columns used by the GROUP BY / filter queries.
+        
+        Derived once with pandas' vectorized accessors so DuckDB reads small
+        ready-made columns instead of calling DATE/HOUR/DAYOFWEEK/MONTH (or
+        scaling durations) on every row of every query:
+        - _date: Appointment date (midnight timestamp)
+        - _hour: Hour of day (0-23)
+        - _dow: Day of week, DuckDB convention (0 = Sunday)
+        - _month: Month number (1-12)
+        - _duration_min: Actual session length in minutes
+        
+        The caller's DataFrame is not modified.
+        """
+        derived = {}
+        
+        if 'Appointment_DateTime' in df.columns:
+            appt = df['Appointment_DateTime']
+            derived['_date'] = appt.dt.normalize()
+            derived['_hour'] = appt.dt.hour.astype('Int8')
+            derived['_dow'] = ((appt.dt.dayofweek + 1) % 7).astype('Int8')
+            derived['_month'] = appt.dt.month.astype('Int8')
+        
+        if 'Actual_Session_Length' in df.columns:
+            derived['_duration_min'] = df['Actual_Session_Length'] * 60
+        
+        return df.assign(**derived) if derived else df
+    
+    def _validate_column(self, column: str) -> str:
+        """
+        Validate a column name and return it quoted for SQL.
+        
+        Raises:
+            ValueError: If the column is not in the data
+        """
+        if column not in self.allowed_columns:
+            raise ValueError(f"Unknown column: {column}")
+        return '"' + column.replace('"', '""') + '"'
+    
+    @staticmethod
+    def _validate_aggregation(aggregation: str) -> str:
+        """
+        Validate an aggregation name against ALLOWED_AGGREGATIONS.
+        
+        Raises:
+            ValueError: If the aggregation is not allowed
+        """
+        aggregation = aggregation.upper()
+        if aggregation not in ALLOWED_AGGREGATIONS:
+            raise ValueError(
+                f"Unsupported aggregation: {aggregation} "
+                f"(allowed: {', '.join(sorted(ALLOWED_AGGREGATIONS))})"
+            )
+        return aggregation
+    
+    @staticmethod
+    def _build_where(semester: Optional[str] = None,
+                     location: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """
+        Build a WHERE clause with ? placeholders for the common filters.
+        
+        Returns:
+            (where_clause: str, params: list of values to bind)
+        """
+        params = []
+        if semester:
+            params.append(semester)
+        if location:
+            params.append(location)
+        
+        where_clause = WHERE_CLAUSES[bool(semester), bool(location)]
+        return where_clause, params
     
+    @_cached
     def sessions_by_date(self, 
                         semester: Optional[str] = None,
                         location: Optional[str] = None,
@@ -79,29 +327,12 @@ class QueryEngine:
         Returns:
             DataFrame with date and session_count columns
         """
-        where_clauses = []
-        if semester:
-            where_clauses.append(f"Semester_Label = '{semester}'")
-        if location:
-            where_clauses.append(f"Location = '{location}'")
-        
-        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-        
-        order = "ASC" if ascending else "DESC"
-        
-        query = f"""
-            SELECT 
-                DATE(Appointment_DateTime) as date,
-                COUNT(*) as session_count
-            FROM df
-            {where_clause}
-            GROUP BY DATE(Appointment_DateTime)
-            ORDER BY session_count {order}
-            LIMIT {limit}
-        """
+        query = SESSIONS_BY_DATE_SQL[bool(semester), bool(location), bool(ascending)]
+        params = [v for v in (semester, location) if v]
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query, params + [int(limit)])
     
+    @_cached
     def sessions_on_specific_date(self, date_str: str) -> Dict[str, Any]:
         """
         Get session count for a specific date.
@@ -112,26 +343,25 @@ class QueryEngine:
         Returns:
             Dictionary with count and details
         """
-        query = f"""
+        query = """
             SELECT 
                 COUNT(*) as count,
                 COUNT(DISTINCT Student_Anon_ID) as unique_students,
-                AVG(Actual_Session_Length * 60) as avg_duration_minutes
+                AVG(_duration_min) as avg_duration_minutes
             FROM df
-            WHERE DATE(Appointment_DateTime) = '{date_str}'
+            WHERE _date = CAST(? AS DATE)
         """
         
-        result = duckdb.query(query).df()
+        # Aggregate without GROUP BY always yields exactly one row of Python scalars
+        count, unique_students, avg_duration = self._fetch_one(query, [date_str])
         
-        if len(result) > 0:
-            return {
-                'count': int(result.iloc[0]['count']) if pd.notna(result.iloc[0]['count']) else 0,
-                'unique_students': int(result.iloc[0]['unique_students']) if pd.notna(result.iloc[0]['unique_students']) else 0,
-                'avg_duration_minutes': round(result.iloc[0]['avg_duration_minutes'], 1) if pd.notna(result.iloc[0]['avg_duration_minutes']) else 0
-            }
-        
-        return {'count': 0, 'unique_students': 0, 'avg_duration_minutes': 0}
+        return {
+            'count': count or 0,
+            'unique_students': unique_students or 0,
+            'avg_duration_minutes': round(avg_duration, 1) if avg_duration is not None else 0
+        }
     
+    @_cached
     def metric_by_semester(self, 
                          metric_column: str,
                          aggregation: str = 'AVG') -> pd.DataFrame:
@@ -140,22 +370,26 @@ class QueryEngine:
         
         Args:
             metric_column: Column name to aggregate (e.g., 'Overall_Satisfaction', 'Actual_Session_Length')
-            aggregation: SQL aggregation function (AVG, SUM, COUNT, MEDIAN, etc.)
+            aggregation: SQL aggregation function (AVG, SUM, COUNT, MEDIAN, MIN, MAX)
             
         Returns:
             DataFrame with semester and metric columns
         """
+        column = self._validate_column(metric_column)
+        aggregation = self._validate_aggregation(aggregation)
+        
         query = f"""
             SELECT 
                 Semester_Label,
-                {aggregation}({metric_column}) as {metric_column}
+                {aggregation}({column}) as {column}
             FROM df
             GROUP BY Semester_Label
             ORDER BY Semester_Label
         """
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query)
     
+    @_cached
     def top_n_metric_by_semester(self,
                                   metric_column: str,
                                   semester: str,
@@ -173,19 +407,21 @@ class QueryEngine:
         Returns:
             DataFrame with top N records
         """
+        column = self._validate_column(metric_column)
         order = "ASC" if ascending else "DESC"
         
         query = f"""
-            SELECT *
+            SELECT {self._select_all}
             FROM df
-            WHERE Semester_Label = '{semester}'
-                AND {metric_column} IS NOT NULL
-            ORDER BY {metric_column} {order}
-            LIMIT {n}
+            WHERE Semester_Label = ?
+                AND {column} IS NOT NULL
+            ORDER BY {column} {order}
+            LIMIT ?
         """
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query, [semester, int(n)])
     
+    @_cached
     def filter_and_count(self,
                         filters: Dict[str, Any],
                         count_column: str = '*') -> int:
@@ -198,27 +434,34 @@ class QueryEngine:
             
         Returns:
             Count of matching records
+            
+        Raises:
+            ValueError: If a filter or count column is not in the data
         """
         where_clauses = []
+        params = []
         for column, value in filters.items():
-            if isinstance(value, str):
-                where_clauses.append(f"{column} = '{value}'")
-            elif pd.isna(value):
+            column = self._validate_column(column)
+            if not isinstance(value, str) and pd.isna(value):
                 where_clauses.append(f"{column} IS NULL")
             else:
-                where_clauses.append(f"{column} = {value}")
+                where_clauses.append(f"{column} = ?")
+                params.append(value)
         
         where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
         
+        if count_column != '*':
+            count_column = self._validate_column(count_column)
+        
         query = f"""
             SELECT COUNT({count_column}) as count
             FROM df
             {where_clause}
         """
         
-        result = duckdb.query(query).df()
-        return int(result.iloc[0]['count'])
+        return self._fetch_scalar(query, params)
     
+    @_cached
     def compare_semesters(self,
                          metric_column: str,
                          semester1: str,
@@ -236,31 +479,113 @@ class QueryEngine:
         Returns:
             Dictionary with values for both semesters and difference
         """
-        query = f"""
-            SELECT 
-                Semester_Label,
-                {aggregation}({metric_column}) as value
-            FROM df
-            WHERE Semester_Label IN ('{semester1}', '{semester2}')
-            GROUP BY Semester_Label
-        """
-        
-        result = duckdb.query(query).df()
-        
-        if len(result) >= 2:
-            val1 = result[result['Semester_Label'] == semester1].iloc[0]['value']
-            val2 = result[result['Semester_Label'] == semester2].iloc[0]['value']
-            difference = float(val2) - float(val1)
+        column = self._validate_column(metric_column)
+        aggregation = self._validate_aggregation(aggregation)
+        
+        if aggregation in NUMPY_AGGREGATIONS and self._semester_codes is not None \
+                and self.df[metric_column].dtype.kind in 'iuf':
+            val1, val2, rows1, rows2 = self._compare_semesters_numpy(
+                metric_column, semester1, semester2, aggregation
+            )
+        else:
+            val1, val2, rows1, rows2 = self._compare_semesters_sql(
+                column, semester1, semester2, aggregation
+            )
+        
+        if rows1 and rows2:
+            val1 = float(val1) if val1 is not None else None
+            val2 = float(val2) if val2 is not None else None
+            difference = val2 - val1 if val1 is not None and val2 is not None else float('nan')
             
             return {
-                semester1: float(val1) if pd.notna(val1) else None,
-                semester2: float(val2) if pd.notna(val2) else None,
+                semester1: val1,
+                semester2: val2,
                 'difference': round(difference, 2),
                 'direction': 'increased' if difference > 0 else 'decreased' if difference < 0 else 'no change'
             }
         
         return {'semester1': None, 'semester2': None, 'difference': None}
     
+    def _group_stats(self, metric_column: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-semester (non-null sum, non-null count, row count) for a numeric column.
+        
+        One np.bincount pass per array over the factorized semester codes;
+        computed once per column and reused for every semester pair.
+        """
+        if metric_column not in self._group_stats_cache:
+            codes = self._semester_codes
+            n_levels = len(self._semester_index)
+            values = self.df[metric_column].to_numpy(dtype='float64', na_value=np.nan)
+            
+            labelled = codes >= 0
+            valid = labelled & ~np.isnan(values)
+            
+            self._group_stats_cache[metric_column] = (
+                np.bincount(codes[valid], weights=values[valid], minlength=n_levels),
+                np.bincount(codes[valid], minlength=n_levels),
+                np.bincount(codes[labelled], minlength=n_levels)
+            )
+        
+        return self._group_stats_cache[metric_column]
+    
+    def _compare_semesters_numpy(self, metric_column: str, semester1: str,
+                                 semester2: str, aggregation: str) -> Tuple[Any, Any, int, int]:
+        """
+        AVG/SUM/COUNT for two semesters from cached per-semester sums.
+        
+        Skips DuckDB dispatch entirely; matches SQL NULL semantics (SUM/AVG
+        over no non-null values is None).
+        
+        Returns:
+            (value1, value2, rows1, rows2)
+        """
+        sums, counts, rows = self._group_stats(metric_column)
+        
+        result = []
+        for semester in (semester1, semester2):
+            code = self._semester_index.get(semester)
+            if code is None:
+                result.append((0 if aggregation == 'COUNT' else None, 0))
+                continue
+            
+            count = int(counts[code])
+            if aggregation == 'COUNT':
+                value = count
+            elif count == 0:
+                value = None
+            elif aggregation == 'SUM':
+                value = sums[code]
+            else:
+                value = sums[code] / count
+            result.append((value, int(rows[code])))
+        
+        (val1, rows1), (val2, rows2) = result
+        return val1, val2, rows1, rows2
+    
+    def _compare_semesters_sql(self, column: str, semester1: str,
+                               semester2: str, aggregation: str) -> Tuple[Any, Any, int, int]:
+        """
+        Any allowed aggregation for two semesters in a single DuckDB scan.
+        
+        Returns:
+            (value1, value2, rows1, rows2)
+        """
+        # Pivot both semesters into one row so no per-semester filtering is
+        # needed afterwards; the counts tell whether each semester has data
+        query = f"""
+            SELECT 
+                {aggregation}({column}) FILTER (WHERE Semester_Label = $semester1),
+                {aggregation}({column}) FILTER (WHERE Semester_Label = $semester2),
+                COUNT(*) FILTER (WHERE Semester_Label = $semester1),
+                COUNT(*) FILTER (WHERE Semester_Label = $semester2)
+            FROM df
+            WHERE Semester_Label IN ($semester1, $semester2)
+        """
+        
+        return self._fetch_one(query, {'semester1': semester1, 'semester2': semester2})
+    
+    @_cached
     def sessions_by_month(self,
                          semester: Optional[str] = None) -> pd.DataFrame:
         """
@@ -272,20 +597,21 @@ class QueryEngine:
         Returns:
             DataFrame with month and session_count columns
         """
-        where_clause = f"WHERE Semester_Label = '{semester}'" if semester else ""
+        where_clause, params = self._build_where(semester=semester)
         
         query = f"""
             SELECT 
-                MONTHNAME(Appointment_DateTime) as month,
+                MONTHNAME(MAKE_DATE(2000, _month, 1)) as month,
                 COUNT(*) as session_count
             FROM df
             {where_clause}
-            GROUP BY MONTH(Appointment_DateTime), MONTHNAME(Appointment_DateTime)
-            ORDER BY MONTH(Appointment_DateTime)
+            GROUP BY _month
+            ORDER BY _month
         """
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query, params)
     
+    @_cached
     def sessions_by_day_of_week(self,
                                semester: Optional[str] = None,
                                location: Optional[str] = None) -> pd.DataFrame:
@@ -299,26 +625,21 @@ class QueryEngine:
         Returns:
             DataFrame with day_of_week and session_count columns
         """
-        where_clauses = []
-        if semester:
-            where_clauses.append(f"Semester_Label = '{semester}'")
-        if location:
-            where_clauses.append(f"Location = '{location}'")
-        
-        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        where_clause, params = self._build_where(semester=semester, location=location)
         
         query = f"""
             SELECT 
-                DAYNAME(Appointment_DateTime) as day_of_week,
+                DAYNAME(MAKE_DATE(2023, 1, 1 + _dow)) as day_of_week,
                 COUNT(*) as session_count
             FROM df
             {where_clause}
-            GROUP BY DAYOFWEEK(Appointment_DateTime), DAYNAME(Appointment_DateTime)
-            ORDER BY DAYOFWEEK(Appointment_DateTime)
+            GROUP BY _dow
+            ORDER BY _dow
         """
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query, params)
     
+    @_cached
     def sessions_by_hour(self,
                        semester: Optional[str] = None,
                        location: Optional[str] = None) -> pd.DataFrame:
@@ -332,26 +653,21 @@ class QueryEngine:
         Returns:
             DataFrame with hour and session_count columns
         """
-        where_clauses = []
-        if semester:
-            where_clauses.append(f"Semester_Label = '{semester}'")
-        if location:
-            where_clauses.append(f"Location = '{location}'")
-        
-        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        where_clause, params = self._build_where(semester=semester, location=location)
         
         query = f"""
             SELECT 
-                EXTRACT(HOUR FROM Appointment_DateTime) as hour,
+                CAST(_hour AS BIGINT) as hour,
                 COUNT(*) as session_count
             FROM df
             {where_clause}
-            GROUP BY hour
-            ORDER BY hour
+            GROUP BY _hour
+            ORDER BY _hour
         """
         
-        return duckdb.query(query).df()
+        return self._fetch_df(query, params)
     
+    @_cached
     def get_busiest_date(self,
                         semester: Optional[str] = None,
                         location: Optional[str] = None) -> Dict[str, Any]:
@@ -365,17 +681,9 @@ class QueryEngine:
         Returns:
             Dictionary with date and count information
         """
-        result = self.sessions_by_date(semester=semester, location=location, limit=1, ascending=False)
-        
-        if len(result) > 0:
-            row = result.iloc[0]
-            return {
-                'date': str(row['date']),
-                'session_count': int(row['session_count'])
-            }
-        
-        return {'date': 'N/A', 'session_count': 0}
+        return self._top_date(semester, location, ascending=False)
     
+    @_cached
     def get_slowest_date(self,
                         semester: Optional[str] = None,
                         location: Optional[str] = None) -> Dict[str, Any]:
@@ -389,13 +697,70 @@ class QueryEngine:
         Returns:
             Dictionary with date and count information
         """
-        result = self.sessions_by_date(semester=semester, location=location, limit=1, ascending=True)
+        return self._top_date(semester, location, ascending=True)
+    
+    def _top_date(self,
+                  semester: Optional[str],
+                  location: Optional[str],
+                  ascending: bool) -> Dict[str, Any]:
+        """
+        Get the single busiest/slowest date as Python scalars.
         
-        if len(result) > 0:
-            row = result.iloc[0]
-            return {
-                'date': str(row['date']),
-                'session_count': int(row['session_count'])
-            }
+        Reads one row with fetchone() rather than materializing a one-row
+        DataFrame through sessions_by_date.
+        """
+        query = SESSIONS_BY_DATE_SQL[bool(semester), bool(location), bool(ascending)]
+        params = [v for v in (semester, location) if v] + [1]
+        
+        row = self._fetch_one(query, params)
+        
+        if row is not None:
+            return {'date': str(row[0]), 'session_count': row[1]}
         
         return {'date': 'N/A', 'session_count': 0}
+    
+    @_cached
+    def get_extreme_dates(self,
+                          semester: Optional[str] = None,
+                          location: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get both the busiest and slowest dates from a single grouped scan.
+        
+        Use this instead of calling get_busiest_date and get_slowest_date
+        back to back, which would aggregate the data twice.
+        
+        Args:
+            semester: Optional semester filter
+            location: Optional location filter
+            
+        Returns:
+            Dictionary with 'busiest' and 'slowest' entries, each holding
+            date and session_count like get_busiest_date/get_slowest_date
+        """
+        where_clause, params = self._build_where(semester=semester, location=location)
+        
+        query = f"""
+            WITH daily AS (
+                SELECT 
+                    CAST(_date AS DATE) as date,
+                    COUNT(*) as session_count
+                FROM df
+                {where_clause}
+                GROUP BY _date
+            )
+            SELECT 
+                ARG_MAX(date, session_count), MAX(session_count),
+                ARG_MIN(date, session_count), MIN(session_count)
+            FROM daily
+        """
+        
+        busiest_date, busiest_count, slowest_date, slowest_count = self._fetch_one(query, params)
+        
+        if busiest_count is None:
+            empty = {'date': 'N/A', 'session_count': 0}
+            return {'busiest': empty, 'slowest': dict(empty)}
+        
+        return {
+            'busiest': {'date': str(busiest_date), 'session_count': int(busiest_count)},
+            'slowest': {'date': str(slowest_date), 'session_count': int(slowest_count)}
+        }
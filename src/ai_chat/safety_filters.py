@@ -4,10 +4,188 @@ Safety and validation filters for AI Chat.
 Prevents off-topic queries and PII leakage.
 """
 
+import atexit
+import queue
 import re
 import os
-from datetime import datetime
-from typing import Tuple
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, TextIO, Tuple
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+# Maximal runs of word characters: a single-word keyword matches r'\bkeyword\b'
+# exactly when it equals one of these tokens
+_TOKEN_REGEX = re.compile(r'\w+')
+
+# Any letter (word characters minus digits and underscore); every keyword and
+# jailbreak pattern contains one
+_LETTER_REGEX = re.compile(r'[^\W\d_]')
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Whether a regex word boundary falls before text[index] (word chars: isalnum() or '_')."""
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    after = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return before != after
+
+
+@lru_cache(maxsize=512)
+def _compile(pattern: str, flags: int = 0) -> re.Pattern:
+    """
+    Compile a regex through a bounded, process-wide cache.
+    
+    Every filter instance gets the same compiled object for the same
+    pattern, and custom keyword lists can't grow the cache without limit.
+    """
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=512)
+def _compile_linear(pattern: str):
+    """
+    Compile a pattern with RE2 when google-re2 is installed, else with re.
+    
+    RE2 matches in linear time (no backtracking blowup on adversarial input)
+    and releases the GIL while scanning. Only used where a yes/no .search()
+    is all we need. RE2 word boundaries are ASCII-only, which can make the
+    phrase prefilter fire more often but never less.
+    """
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return _compile(pattern)
+
+
+@lru_cache(maxsize=512)
+def _normalize(text: str) -> str:
+    """
+    Lowercase a query for keyword/pattern matching.
+    
+    Cached so a query that is validated again (e.g. on a Streamlit rerun)
+    is only lowercased once. Responses are matched with re.IGNORECASE
+    instead, so long LLM output is never copied just to lowercase it.
+    """
+    return text.lower()
+
+
+# Consolidated query/response log in the project root (resolved once at import;
+# append_log creates the directory on first write)
+DEFAULT_LOG_FILE = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'logs', 'queries.log')
+)
+
+# (epoch second, formatted local time) of the most recent log timestamp
+_last_timestamp: Tuple[int, str] = (-1, "")
+
+
+def log_timestamp() -> str:
+    """
+    Current local time as 'YYYY-MM-DD HH:MM:SS' for log entries.
+    
+    strftime runs at most once per wall-clock second; entries logged within
+    the same second reuse the formatted string.
+    """
+    global _last_timestamp
+    
+    now = int(time.time())
+    second, text = _last_timestamp
+    if now != second:
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _last_timestamp = (now, text)
+    return text
+
+
+# Log entries are written by a background thread, so handling a query never
+# waits on disk I/O. The queue holds (log_file, entry) pairs; None stops the writer.
+_log_queue: "queue.SimpleQueue[Optional[Tuple[str, str]]]" = queue.SimpleQueue()
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def append_log(log_file: str, entry: str):
+    """
+    Queue an entry to be appended to a log file.
+    
+    Entries are written in order by a background thread that keeps one
+    handle open per file and writes each batch with a single writelines()
+    call. Queued entries are written before the process exits.
+    """
+    if _log_writer is None:
+        _start_log_writer()
+    _log_queue.put((log_file, entry))
+
+
+def _start_log_writer():
+    """Start the background log writer thread (once per process)."""
+    global _log_writer
+    
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_write_logs, name="query-log-writer", daemon=True)
+            _log_writer.start()
+
+
+def _write_logs():
+    """Drain the log queue in batches until the None sentinel arrives."""
+    handles: Dict[str, TextIO] = {}
+    running = True
+    
+    while running:
+        # Block for the next entry, then take everything else already queued
+        batch = [_log_queue.get()]
+        while not _log_queue.empty():
+            batch.append(_log_queue.get())
+        
+        entries_by_file: Dict[str, List[str]] = {}
+        for item in batch:
+            if item is None:
+                running = False
+                continue
+            log_file, entry = item
+            entries_by_file.setdefault(log_file, []).append(entry)
+        
+        for log_file, entries in entries_by_file.items():
+            try:
+                handle = handles.get(log_file)
+                if handle is None:
+                    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+                    handle = handles[log_file] = open(log_file, 'a', encoding='utf-8')
+                handle.writelines(entries)
+                handle.flush()
+            except Exception as e:
+                # Silently fail on logging errors to not break the app
+                print(f"Warning: Failed to write to {log_file}: {e}")
+    
+    for handle in handles.values():
+        handle.close()
+
+
+@atexit.register
+def _stop_log_writer():
+    """Write any queued log entries before the interpreter exits."""
+    if _log_writer is not None:
+        _log_queue.put(None)
+        _log_writer.join(timeout=5)
 
 
 class InputValidator:
@@ -23,6 +201,38 @@ class InputValidator:
     - All blocked queries to blocked_queries.log for review
     """
     
+    # User-facing rejection messages keyed by reason category
+    REJECTION_MESSAGES = {
+        "off_topic": (
+            "I'm a data analysis assistant for Writing Studio analytics. "
+            "I can only answer questions about the session data you've uploaded. "
+            "Please ask about patterns, trends, or insights in your data."
+        ),
+        "inappropriate": (
+            "I cannot respond to that type of query. "
+            "Please ask questions related to your session data."
+        ),
+        "jailbreak_attempt": (
+            "I'm designed to only discuss your session data. "
+            "Please ask about the analytics in your report."
+        ),
+        "no_writing_studio_context": (
+            "I didn't detect any Writing Studio-specific terms in your question. "
+            "I can help with questions about sessions, appointments, students, consultants, "
+            "tutors, satisfaction ratings, courses, booking patterns, and trends. "
+            "Please ask something related to your Writing Studio data."
+        ),
+        "no_data_keywords": (
+            "I didn't detect any data-related terms in your question. "
+            "I can help with questions about sessions, students, consultants, "
+            "times, dates, courses, satisfaction, and trends. What would you like to know?"
+        ),
+        "default": (
+            "I can only answer questions about your session data. "
+            "Please ask about patterns, trends, or specific metrics."
+        ),
+    }
+    
     def __init__(self, log_blocked_queries: bool = True, log_file: str = None):
         """
         Initialize InputValidator.
@@ -33,14 +243,7 @@ class InputValidator:
         """
         # Configure logging
         self.log_blocked_queries = log_blocked_queries
-        if log_file is None:
-            self.log_file = os.path.join(os.getcwd(), 'logs', 'queries.log')
-        else:
-            self.log_file = log_file
-        
-        # Create logs directory if it doesn't exist
-        if self.log_blocked_queries:
-            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        self.log_file = DEFAULT_LOG_FILE if log_file is None else log_file
         
         # Off-topic keywords (non-data questions)
         self.off_topic_keywords = [
@@ -199,7 +402,99 @@ class InputValidator:
             # Comparison terms
             'more', 'less', 'than', 'compare', 'comparison'
         ]
+        
+        # Single-word keywords are looked up in the query's token set; only
+        # phrases and keywords with punctuation ('walk-in', 'vs.') need a regex
+        self._data_word_keywords, self._data_keyword_regexes = self._split_keywords(self.data_keywords)
+        self._off_topic_word_keywords, self._off_topic_regexes = self._split_keywords(self.off_topic_keywords)
+        self._harmful_word_keywords, self._harmful_regexes = self._split_keywords(self.harmful_keywords)
+        
+        # Single-word keywords as one token -> total weight table, so scoring is
+        # a single pass over the query's tokens
+        self._word_weights: Dict[str, int] = {}
+        for weight, words in ((2, self._data_word_keywords),
+                              (-3, self._off_topic_word_keywords),
+                              (-5, self._harmful_word_keywords)):
+            for word in words:
+                self._word_weights[word] = self._word_weights.get(word, 0) + weight
+        
+        # Every phrase keyword in one whole-word alternation: a single scan tells
+        # us whether the per-keyword regexes need to run at all
+        self._phrase_regex = _compile_linear(
+            r'\b(?:' + "|".join(
+                re.escape(keyword)
+                for keyword, _ in self._data_keyword_regexes + self._off_topic_regexes + self._harmful_regexes
+            ) + r')\b'
+        )
+        
+        # With pyahocorasick installed, all phrase keywords are found in one
+        # automaton pass instead of the per-keyword regexes
+        self._phrase_automaton = self._build_phrase_automaton() if AHOCORASICK_AVAILABLE else None
+        
+        # The check is a pure function of the lowercased query (retries and
+        # reruns repeat queries verbatim), so memoize it per instance
+        self._check_query = lru_cache(maxsize=4096)(self._check_query_uncached)
+        
+        # All jailbreak patterns as one alternation (a single search per query)
+        self._jailbreak_regex = _compile_linear(
+            "|".join(f"(?:{pattern})" for pattern in self.jailbreak_patterns)
+        )
+    
+    @staticmethod
+    def _split_keywords(keywords: List[str]) -> Tuple[FrozenSet[str], List[Tuple[str, re.Pattern]]]:
+        """
+        Split a keyword list into token-set and regex matchers.
+        
+        Returns:
+            (single-word keywords, [(keyword, whole-word regex)] for the rest)
+        """
+        words = frozenset(keyword for keyword in keywords if _TOKEN_REGEX.fullmatch(keyword))
+        regexes = [
+            (keyword, _compile(r'\b' + re.escape(keyword) + r'\b'))
+            for keyword in keywords if keyword not in words
+        ]
+        return words, regexes
 
+    def _build_phrase_automaton(self):
+        """Build an Aho-Corasick automaton mapping each phrase keyword to its total weight."""
+        weights: Dict[str, int] = {}
+        for weight, regexes in ((2, self._data_keyword_regexes),
+                                (-3, self._off_topic_regexes),
+                                (-5, self._harmful_regexes)):
+            for keyword, _ in regexes:
+                weights[keyword] = weights.get(keyword, 0) + weight
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, weight in weights.items():
+            automaton.add_word(keyword, (keyword, weight))
+        automaton.make_automaton()
+        return automaton
+    
+    def _match_phrase_keywords(self, query_lower: str) -> List[Tuple[int, str]]:
+        """
+        Find the phrase/punctuated keywords present in a query as whole words.
+        
+        Returns:
+            List of (weight, keyword) for each matched keyword
+        """
+        if self._phrase_automaton is not None:
+            matches: Dict[str, int] = {}
+            for end, (keyword, weight) in self._phrase_automaton.iter(query_lower):
+                start = end - len(keyword) + 1
+                if _is_word_boundary(query_lower, start) and _is_word_boundary(query_lower, end + 1):
+                    matches[keyword] = weight
+            return [(weight, keyword) for keyword, weight in matches.items()]
+        
+        # Most queries contain no phrase keyword at all
+        if not self._phrase_regex.search(query_lower):
+            return []
+        
+        return (
+            [(2, keyword) for keyword, regex in self._data_keyword_regexes if regex.search(query_lower)]
+            + [(-3, keyword) for keyword, regex in self._off_topic_regexes if regex.search(query_lower)]
+            + [(-5, keyword) for keyword, regex in self._harmful_regexes if regex.search(query_lower)]
+        )
+    
     def is_on_topic(self, query: str) -> Tuple[bool, str]:
         """
         Check if query is about the Writing Studio data using weighted scoring.
@@ -216,32 +511,29 @@ class InputValidator:
         Returns:
             (is_valid: bool, reason: str)
         """
-        query_lower = query.lower()
-        score = 0
-        matched_terms = []
-        
-        # Add points for data-related keywords (+2 each)
-        for keyword in self.data_keywords:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', query_lower):
-                score += 2
-                matched_terms.append(f"+2:{keyword}")
-        
-        # Subtract points for off-topic keywords (-3 each)
-        for keyword in self.off_topic_keywords:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', query_lower):
-                score -= 3
-                matched_terms.append(f"-3:off_topic:{keyword}")
-        
-        # Subtract points for harmful keywords (-5 each)
-        for keyword in self.harmful_keywords:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', query_lower):
-                score -= 5
-                matched_terms.append(f"-5:harmful:{keyword}")
-        
-        # Check for jailbreak attempts (instant block)
-        for pattern in self.jailbreak_patterns:
-            if re.search(pattern, query_lower):
-                return False, "jailbreak_attempt"
+        # Too short (shortest keyword is 3 chars) or letterless ("?", "123",
+        # emoji) queries can't match any blacklisted keyword or jailbreak
+        # phrase, so the score can't go negative
+        if len(query) < 3 or not _LETTER_REGEX.search(query):
+            return True, "valid"
+        
+        return self._check_query(_normalize(query))
+    
+    def _check_query_uncached(self, query_lower: str) -> Tuple[bool, str]:
+        """Score a lowercased query and check it for jailbreak attempts (see is_on_topic)."""
+        # Check for jailbreak attempts first (instant block, no scoring needed)
+        if self._jailbreak_regex.search(query_lower):
+            return False, "jailbreak_attempt"
+        
+        # Single-word keywords: one weight lookup per distinct token
+        word_weights = self._word_weights
+        score = sum(
+            word_weights[token] for token in set(_TOKEN_REGEX.findall(query_lower))
+            if token in word_weights
+        )
+        
+        # Phrases and punctuated keywords ('capital of', 'walk-in', ...)
+        score += sum(weight for weight, _ in self._match_phrase_keywords(query_lower))
         
         # Block only if score is negative
         if score < 0:
@@ -262,7 +554,7 @@ class InputValidator:
             return
         
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = log_timestamp()
             log_entry = f"[{timestamp}] QUERY\n"
             log_entry += f"User: \"{query}\"\n"
             log_entry += f"Status: {status}"
@@ -270,8 +562,7 @@ class InputValidator:
                 log_entry += f"\nReason: {reason}"
             log_entry += "\n" + "─" * 50 + "\n"
             
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
+            append_log(self.log_file, log_entry)
         except Exception as e:
             # Silently fail on logging errors to not break the app
             print(f"Warning: Failed to log query: {e}")
@@ -279,41 +570,12 @@ class InputValidator:
     def get_rejection_message(self, reason: str) -> str:
         """
         Get user-friendly rejection message.
+        
+        The reason's category (the part before any ':' detail) selects the
+        message; unknown categories get the default.
         """
-        if reason.startswith("off_topic"):
-            return (
-                "I'm a data analysis assistant for Writing Studio analytics. "
-                "I can only answer questions about the session data you've uploaded. "
-                "Please ask about patterns, trends, or insights in your data."
-            )
-        elif reason.startswith("inappropriate"):
-            return (
-                "I cannot respond to that type of query. "
-                "Please ask questions related to your session data."
-            )
-        elif reason == "jailbreak_attempt":
-            return (
-                "I'm designed to only discuss your session data. "
-                "Please ask about the analytics in your report."
-            )
-        elif reason == "no_writing_studio_context":
-            return (
-                "I didn't detect any Writing Studio-specific terms in your question. "
-                "I can help with questions about sessions, appointments, students, consultants, "
-                "tutors, satisfaction ratings, courses, booking patterns, and trends. "
-                "Please ask something related to your Writing Studio data."
-            )
-        elif reason == "no_data_keywords":
-            return (
-                "I didn't detect any data-related terms in your question. "
-                "I can help with questions about sessions, students, consultants, "
-                "times, dates, courses, satisfaction, and trends. What would you like to know?"
-            )
-        else:
-            return (
-                "I can only answer questions about your session data. "
-                "Please ask about patterns, trends, or specific metrics."
-            )
+        category = reason.split(":", 1)[0]
+        return self.REJECTION_MESSAGES.get(category, self.REJECTION_MESSAGES["default"])
 
 
 class ResponseFilter:
@@ -328,8 +590,8 @@ class ResponseFilter:
     """
     
     def __init__(self):
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        self.anon_id_pattern = re.compile(r'\b(STU|TUT)_(\d+)\b')
+        self.email_pattern = _compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+        self.anon_id_pattern = _compile(r'\b(STU|TUT)_(\d+)\b')
         
         # Suspicious phrases (PII-related)
         self.suspicious_phrases = [
@@ -343,26 +605,26 @@ class ResponseFilter:
             "individual tutor"
         ]
         
-        # Generic knowledge patterns (indicating off-topic response)
-        self.generic_knowledge_patterns = [
+        # Obvious generic knowledge patterns (checked by contains_generic_knowledge)
+        self.obvious_generic_patterns = [
             # Animal/biology responses
             r'\b(life expectancy|lifespan|years in the wild|years in captivity)\b',
             r'\b(species|habitat|diet|behavior)\s+of\b',
-            r'\b(lion|tiger|elephant|giraffe|zebra|hippo|hippopotamus)\b',
-            # Geography responses
-            r'\b(capital of|located in|borders|continent|ocean)\b',
-            r'\b(country|nation|state|province)\s+of\b',
-            # History/science responses
-            r'\b(invented|discovered|created|developed)\s+by\b',
-            r'\b(year\s+(\d{4}|in|of))',
+            r'\b(lions?|tigers?|elephants?|giraffes?|zebras?|hippopotamus|hippos?)\b',
             # Entertainment responses
             r'\b(won the|starring|directed by|released in)\b',
-            # Weather responses
-            r'\b(degrees|fahrenheit|celsius|forecast)\b',
             # Recipe/cooking responses
             r'\b(ingredients|cook for|bake for|preheat)\b',
+            # Weather responses
+            r'\b(degrees|fahrenheit|celsius|forecast)\b',
         ]
         
+        # One alternation; the named group (g<index>) reports which pattern matched
+        self._generic_regex = _compile(
+            "|".join(f"(?P<g{i}>{pattern})" for i, pattern in enumerate(self.obvious_generic_patterns)),
+            re.IGNORECASE
+        )
+        
         # Writing Studio data-related terms (valid response indicators)
         self.valid_data_terms = [
             'session', 'sessions', 'appointment', 'appointments',
@@ -372,6 +634,72 @@ class ResponseFilter:
             'hour', 'hours', 'day', 'days', 'week', 'weeks', 'month', 'months',
             'course', 'courses', 'booking', 'bookings', 'walk-in', 'check-in'
         ]
+        
+        # Phrase/term lists as single alternations: one scan instead of one per entry.
+        # Response-side patterns ignore case rather than lowercasing the response.
+        self._suspicious_regex = _compile(
+            "|".join(map(re.escape, self.suspicious_phrases)), re.IGNORECASE
+        )
+        self._valid_terms_regex = _compile(
+            "|".join(map(re.escape, self.valid_data_terms)), re.IGNORECASE
+        )
+        
+        # All PII checks in one Hyperscan database (one scan per response) when
+        # the library is installed; expression ids follow is_safe's check order
+        self._pii_reasons = (
+            ["Response contains anonymous ID"]
+            + [f"Response contains suspicious phrase: {phrase}" for phrase in self.suspicious_phrases]
+            + ["Response contains email address"]
+        )
+        self._pii_database = self._build_pii_database() if HYPERSCAN_AVAILABLE else None
+        self._pii_scratch = threading.local()
+        
+        # Both checks are pure functions of the response; memoize them per instance
+        self._check_pii = lru_cache(maxsize=1024)(self._check_pii_uncached)
+        self._check_generic = lru_cache(maxsize=1024)(self._check_generic_uncached)
+
+    def _build_pii_database(self):
+        """Compile the anonymous-ID, suspicious-phrase and email patterns for Hyperscan."""
+        single = hyperscan.HS_FLAG_SINGLEMATCH
+        expressions = (
+            [self.anon_id_pattern.pattern]
+            + [re.escape(phrase) for phrase in self.suspicious_phrases]
+            + [self.email_pattern.pattern]
+        )
+        flags = (
+            [single]
+            + [single | hyperscan.HS_FLAG_CASELESS] * len(self.suspicious_phrases)
+            + [single]
+        )
+        
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[expression.encode('ascii') for expression in expressions],
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=flags
+        )
+        return database
+
+    def _scan_pii(self, response: str) -> Optional[str]:
+        """
+        Run the Hyperscan PII database over an ASCII response.
+        
+        Returns:
+            Reason for the first failing check in is_safe order, or None
+        """
+        scratch = getattr(self._pii_scratch, 'scratch', None)
+        if scratch is None:
+            # Scratch space is per thread; the database itself is shared
+            scratch = self._pii_scratch.scratch = hyperscan.Scratch(self._pii_database)
+        
+        hits = []
+        self._pii_database.scan(
+            response.encode('ascii'),
+            match_event_handler=lambda expression_id, start, end, flags, context: hits.append(expression_id),
+            scratch=scratch
+        )
+        return self._pii_reasons[min(hits)] if hits else None
 
     def is_safe(self, response: str) -> Tuple[bool, str]:
         """
@@ -380,20 +708,33 @@ class ResponseFilter:
         Returns:
             (is_safe: bool, reason: str)
         """
-        response_lower = response.lower()
+        return self._check_pii(response)
 
-        # Check for email addresses
-        if self.email_pattern.search(response):
-            return False, "Response contains email address"
-
-        # Check for anonymous IDs
-        if self.anon_id_pattern.search(response):
+    def _check_pii_uncached(self, response: str) -> Tuple[bool, str]:
+        """Run the PII checks behind is_safe."""
+        # Nothing shorter than an anonymous ID like "STU_1" can match below
+        if len(response) < 5:
+            return True, "Safe"
+        
+        # Hyperscan handles ASCII responses (nearly all of them) in one pass; its
+        # word boundaries and case folding are ASCII-only, so other text uses re
+        if self._pii_database is not None and response.isascii():
+            reason = self._scan_pii(response)
+            return (False, reason) if reason else (True, "Safe")
+        
+        # Check for anonymous IDs (the most likely leak in this data); the
+        # literal prefix test skips the regex for the usual ID-free response
+        if ("STU_" in response or "TUT_" in response) and self.anon_id_pattern.search(response):
             return False, "Response contains anonymous ID"
 
         # Check for suspicious phrases
-        for phrase in self.suspicious_phrases:
-            if phrase in response_lower:
-                return False, f"Response contains suspicious phrase: {phrase}"
+        match = self._suspicious_regex.search(response)
+        if match:
+            return False, f"Response contains suspicious phrase: {match.group().lower()}"
+
+        # Check for email addresses (none without an '@')
+        if "@" in response and self.email_pattern.search(response):
+            return False, "Response contains email address"
 
         return True, "Safe"
 
@@ -410,34 +751,23 @@ class ResponseFilter:
         Returns:
             (is_generic: bool, reason: str)
         """
-        response_lower = response.lower()
-        
+        return self._check_generic(response)
+    
+    def _check_generic_uncached(self, response: str) -> Tuple[bool, str]:
+        """Run the generic-knowledge checks behind contains_generic_knowledge."""
         # Check for obvious generic knowledge patterns only
-        obvious_generic_patterns = [
-            # Animal/biology responses
-            r'\b(life expectancy|lifespan|years in the wild|years in captivity)\b',
-            r'\b(species|habitat|diet|behavior)\s+of\b',
-            r'\b(lions?|tigers?|elephants?|giraffes?|zebras?|hippopotamus|hippos?)\b',
-            # Entertainment responses
-            r'\b(won the|starring|directed by|released in)\b',
-            # Recipe/cooking responses
-            r'\b(ingredients|cook for|bake for|preheat)\b',
-            # Weather responses
-            r'\b(degrees|fahrenheit|celsius|forecast)\b',
-        ]
-        
-        for pattern in obvious_generic_patterns:
-            if re.search(pattern, response_lower):
-                return True, f"Generic knowledge detected: {pattern}"
-        
-        # Check if response contains ANY valid data-related terms
-        # If a response is about Writing Studio data, it should contain at least one of these
-        has_valid_term = any(term in response_lower for term in self.valid_data_terms)
+        match = self._generic_regex.search(response)
+        if match:
+            pattern = self.obvious_generic_patterns[int(match.lastgroup[1:])]
+            return True, f"Generic knowledge detected: {pattern}"
         
         # Only flag if response is substantial (>150 chars) and has absolutely zero data context
         # This allows brief contextual responses that may not have data terms
-        if len(response) > 150 and not has_valid_term:
-            return True, "Response contains no Writing Studio data terms"
+        if len(response) > 150:
+            # If a response is about Writing Studio data, it should contain at least one
+            # valid data-related term (scanned only when the answer can matter)
+            if not self._valid_terms_regex.search(response):
+                return True, "Response contains no Writing Studio data terms"
         
         return False, "Not generic knowledge"
     
@@ -471,3 +801,9 @@ class ResponseFilter:
             )
         
         return response
+
+
+# Shared default instances: the keyword/pattern setup runs once per process
+# rather than once per ChatHandler (both classes are stateless after __init__)
+DEFAULT_INPUT_VALIDATOR = InputValidator()
+DEFAULT_RESPONSE_FILTER = ResponseFilter()
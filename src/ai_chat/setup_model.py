@@ -4,9 +4,74 @@ Model Setup Script for Gemma 3 4B
 Downloads and prepares the Gemma 3 4B Instruct GGUF model for local use.
 """
 
+import hashlib
+import importlib.util
+import mmap
+import os
+import platform
+import shutil
+import subprocess
 import sys
+from functools import lru_cache
 from pathlib import Path
-from huggingface_hub import hf_hub_download
+from typing import Optional, Tuple
+
+
+# Map quantization to filename
+# Gemma 3 4B
+_FILENAME_MAP = {
+    "Q4_0": "gemma-3-4b-it-q4_0.gguf",
+    # The primary repo only ships the quantization-aware-trained (QAT) Q4_0,
+    # which Google tuned for 4-bit and which matches K-quant quality
+    "Q4_K_M": "gemma-3-4b-it-q4_0.gguf",
+    "Q5_K_M": "gemma-3-4b-it-q5_0.gguf",
+    "Q8_0": "gemma-3-4b-it-q8_0.gguf",
+    "f16": "gemma-3-4b-it-f16.gguf"
+}
+
+
+def _file_sha256(path: Path) -> str:
+    """
+    Return a file's sha256, reusing the <file>.sha256 sidecar while the file is unchanged.
+    
+    The sidecar records the digest with the file's size and mtime, so repeated
+    --force runs only rehash a multi-GB model after it has actually changed.
+    """
+    stat = path.stat()
+    stamp = f"{stat.st_size} {stat.st_mtime_ns}"
+    sidecar = path.with_name(path.name + '.sha256')
+    
+    try:
+        cached_digest, cached_stamp = sidecar.read_text(encoding='utf-8').split(' ', 1)
+        if cached_stamp.strip() == stamp:
+            return cached_digest
+    except (OSError, ValueError):
+        pass
+    
+    # Hash through a read-only mapping: no Python-level read loop or copies
+    digest = hashlib.sha256()
+    if stat.st_size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            digest.update(mapped)
+    
+    try:
+        sidecar.write_text(f"{digest.hexdigest()} {stamp}\n", encoding='utf-8')
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+
+def _remote_sha256(repo_id: str, filename: str) -> Optional[str]:
+    """Return the LFS sha256 Hugging Face reports for a file, or None if unknown."""
+    from huggingface_hub import HfApi
+    
+    info = HfApi().model_info(repo_id, files_metadata=True)
+    for sibling in info.siblings or []:
+        if sibling.rfilename == filename and sibling.lfs is not None:
+            return sibling.lfs.sha256
+    return None
 
 
 def download_gemma_model(
@@ -28,6 +93,14 @@ def download_gemma_model(
     Returns:
         Path to the downloaded model file
     """
+    # Use parallel ranged downloads when hf_transfer is installed. Must be set
+    # before huggingface_hub is imported, since it reads the flag at import.
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+    
+    # Imported here so detect_gpu()/get_model_path() work without huggingface_hub
+    from huggingface_hub import hf_hub_download
+    
     # Create models directory
     model_path = Path(model_dir)
     model_path.mkdir(parents=True, exist_ok=True)
@@ -42,21 +115,11 @@ def download_gemma_model(
         "google/gemma-2-2b-it-GGUF",
     ]
     
-    # Map quantization to filename
-    # Gemma 3 4B
-    filename_map = {
-        "Q4_0": "gemma-3-4b-it-q4_0.gguf",
-        "Q4_K_M": "gemma-3-4b-it-q4_0.gguf",
-        "Q5_K_M": "gemma-3-4b-it-q5_0.gguf",
-        "Q8_0": "gemma-3-4b-it-q8_0.gguf",
-        "f16": "gemma-3-4b-it-f16.gguf"
-    }
-    
-    if quantization not in filename_map:
+    if quantization not in _FILENAME_MAP:
         print(f"Warning: Unknown quantization '{quantization}', using Q4_0")
         quantization = "Q4_0"
     
-    filename = filename_map[quantization]
+    filename = _FILENAME_MAP[quantization]
     local_path = model_path / filename
     
     # Check if model already exists
@@ -74,11 +137,24 @@ def download_gemma_model(
         print(f"Attempting repository {i}/{len(repo_options)}: {repo_id}")
         
         try:
+            # On --force, keep the local file if it already matches this repo's copy
+            if force_download and local_path.exists():
+                try:
+                    expected = _remote_sha256(repo_id, filename)
+                except Exception as e:
+                    # Metadata is only needed for this shortcut; still try the download
+                    print(f"⚠️  Could not fetch checksum, re-downloading: {str(e)[:100]}")
+                    expected = None
+                if expected is not None and _file_sha256(local_path) == expected:
+                    print(f"✅ Local model matches {repo_id} (sha256), skipping download")
+                    return str(local_path)
+            
             downloaded_path = hf_hub_download(
                 repo_id=repo_id,
                 filename=filename,
                 cache_dir=model_dir,
                 local_dir=model_dir,
+                force_download=force_download,
             )
             
             print("✅ Download complete!")
@@ -142,20 +218,11 @@ def get_model_path(model_dir: str = "models", quantization: str = "Q4_0") -> str
     Raises:
         FileNotFoundError: If model file doesn't exist
     """
-    # Map quantization to filename
-    filename_map = {
-        "Q4_0": "gemma-3-4b-it-q4_0.gguf",
-        "Q4_K_M": "gemma-3-4b-it-q4_0.gguf",
-        "Q5_K_M": "gemma-3-4b-it-q5_0.gguf",
-        "Q8_0": "gemma-3-4b-it-q8_0.gguf",
-        "f16": "gemma-3-4b-it-f16.gguf"
-    }
-    
-    if quantization not in filename_map:
+    if quantization not in _FILENAME_MAP:
         print(f"Warning: Unknown quantization '{quantization}', using Q4_0")
         quantization = "Q4_0"
     
-    filename = filename_map[quantization]
+    filename = _FILENAME_MAP[quantization]
     model_path = Path(model_dir) / filename
     
     if not model_path.exists():
@@ -168,6 +235,37 @@ def get_model_path(model_dir: str = "models", quantization: str = "Q4_0") -> str
     return str(model_path)
 
 
+@lru_cache(maxsize=1)
+def detect_gpu() -> Optional[Tuple[str, str]]:
+    """
+    Detect GPU acceleration usable by llama.cpp, without importing torch.
+    
+    Probes for Apple Silicon (Metal) and an NVIDIA driver (nvidia-smi) instead
+    of loading torch just to call cuda.is_available(). Cached per process.
+    
+    Returns:
+        (acceleration, device_name), e.g. ("CUDA", "NVIDIA GeForce RTX 3060"),
+        or None when only the CPU is available
+    """
+    if sys.platform == 'darwin' and platform.machine() == 'arm64':
+        return "Metal (MPS)", "Apple Metal (MPS)"
+    
+    nvidia_smi = shutil.which('nvidia-smi')
+    if nvidia_smi:
+        try:
+            result = subprocess.run(
+                [nvidia_smi, '--query-gpu=name', '--format=csv,noheader'],
+                capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        names = result.stdout.strip().splitlines()
+        if result.returncode == 0 and names:
+            return "CUDA", names[0].strip()
+    
+    return None
+
+
 def check_system_requirements() -> dict:
     """
     Check if system meets minimum requirements for running Gemma 3 4B.
@@ -212,21 +310,15 @@ def check_system_requirements() -> dict:
         info['recommended_max_ctx'] = 128000
         print(f"✅ Good RAM ({total_ram:.1f}GB). Can use larger context window.")
     
-    # Check for GPU support
-    try:
-        import torch  # type: ignore
-        if torch.cuda.is_available():
-            info['gpu_available'] = True
-            info['gpu_name'] = torch.cuda.get_device_name(0)
-            print(f"✅ CUDA GPU detected: {info['gpu_name']}")
-    except ImportError:
-        pass
-    
-    # Check for Metal (macOS)
-    if sys.platform == 'darwin':
+    # Check for GPU support (CUDA or Apple Metal)
+    gpu = detect_gpu()
+    if gpu is not None:
+        acceleration, info['gpu_name'] = gpu
         info['gpu_available'] = True
-        info['gpu_name'] = 'Apple Metal (MPS)'
-        print("✅ Apple Metal GPU available (macOS)")
+        if acceleration == "CUDA":
+            print(f"✅ CUDA GPU detected: {info['gpu_name']}")
+        else:
+            print("✅ Apple Metal GPU available (macOS)")
     
     return info
 
@@ -1,8 +1,16 @@
 # src/core/data_cleaner.py
 
+import csv
+import re
+import sys
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import warnings
+from datetime import datetime
+from pandas.tseries.api import guess_datetime_format
+from src.utils.text_matching import contains_lower
 
 warnings.filterwarnings('ignore')
 
@@ -11,29 +19,30 @@ warnings.filterwarnings('ignore')
 # SESSION TYPE DETECTION
 # ============================================================================
 
+# Scheduled session indicators
+_SCHEDULED_INDICATORS = frozenset([
+    'Appointment Type',
+    'Requested Length',
+    'Student - On a scale of 1-5'
+])
+
+# Walk-in indicators
+_WALKIN_INDICATORS = frozenset([
+    'Duration Minutes',
+    'Check In At Date',
+    'Check In At Time'
+])
+
+
 def detect_session_type(df):
     """
     Auto-detect whether this is scheduled sessions or walk-in data.
     
     Returns: 'scheduled', 'walkin', or 'unknown'
     """
-    # Scheduled session indicators
-    scheduled_indicators = [
-        'Appointment Type',
-        'Requested Length',
-        'Student - On a scale of 1-5'
-    ]
-    
-    # Walk-in indicators
-    walkin_indicators = [
-        'Duration Minutes',
-        'Check In At Date',
-        'Check In At Time'
-    ]
-    
-    # Check for scheduled
-    scheduled_score = sum(1 for col in scheduled_indicators if col in df.columns)
-    walkin_score = sum(1 for col in walkin_indicators if col in df.columns)
+    cols = frozenset(df.columns)
+    scheduled_score = len(_SCHEDULED_INDICATORS & cols)
+    walkin_score = len(_WALKIN_INDICATORS & cols)
     
     if scheduled_score >= 2:
         return 'scheduled'
@@ -53,21 +62,39 @@ def clean_column_names(df):
     Penji exports often have trailing spaces that break column matching.
     """
     df_clean = df.copy()
-    df_clean.columns = df_clean.columns.str.strip()
+    _clean_column_names_inplace(df_clean)
     return df_clean
 
 
+def _clean_column_names_inplace(df_clean):
+    """Strip whitespace from column names in place (see clean_column_names)."""
+    df_clean.columns = df_clean.columns.str.strip()
+
+
 # ============================================================================
 # DATETIME MERGING
 # ============================================================================
 
+# Date + time formats seen in Penji exports, tried when pandas can't guess one
+_DATETIME_FORMATS = (
+    '%Y-%m-%d %I:%M %p', '%Y-%m-%d %I:%M:%S %p',
+    '%m/%d/%Y %I:%M %p', '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S',
+)
+
+
 def merge_datetime_columns(df):
     """
     Merge separate date and time columns into single datetime objects.
     Handles NaN gracefully.
     """
     df_merged = df.copy()
-    
+    _merge_datetime_columns_inplace(df_merged)
+    return df_merged
+
+
+def _merge_datetime_columns_inplace(df_merged):
+    """Add the merged datetime columns in place (see merge_datetime_columns)."""
     # Define date/time pairs to merge
     datetime_pairs = [
         ('Requested At Date', 'Requested At Time', 'Booking_DateTime'),
@@ -79,19 +106,110 @@ def merge_datetime_columns(df):
     
     for date_col, time_col, new_col in datetime_pairs:
         if date_col in df_merged.columns and time_col in df_merged.columns:
-            # Combine date and time, handling NaN
-            df_merged[new_col] = pd.to_datetime(
-                df_merged[date_col].astype(str) + ' ' + df_merged[time_col].astype(str),
-                errors='coerce'  # NaN if either is missing
-            )
+            df_merged[new_col] = _parse_date_time(df_merged[date_col], df_merged[time_col])
+
+
+def _parse_date_time(dates, times):
+    """
+    Combine a date and a time column into one datetime column (NaT if either is missing).
     
-    return df_merged
+    Parses with the format of the first complete row so pandas stays on its
+    fast C parser; a leading "nan nan" row would otherwise make it fall back
+    to parsing every row individually. Rows that don't match that format are
+    retried with pandas' own inference.
+    """
+    present = dates.notna() & times.notna()
+    if not present.any():
+        return pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+    
+    combined = dates[present].astype(str) + ' ' + times[present].astype(str)
+    date_format = _detect_datetime_format(combined.iloc[0])
+    
+    if date_format is None:
+        parsed = pd.to_datetime(combined, errors='coerce')
+    else:
+        parsed = pd.to_datetime(combined, format=date_format, errors='coerce', cache=True)
+        unparsed = parsed.isna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(combined[unparsed], errors='coerce')
+    
+    merged = pd.Series(pd.NaT, index=dates.index, dtype=parsed.dtype)
+    merged[present] = parsed
+    return merged
+
+
+def _detect_datetime_format(sample):
+    """
+    Return the strptime format of a combined "date time" string, or None if unknown.
+    
+    pandas' guesser can't infer 12-hour clock formats ("2:30 PM"), so common
+    export formats are tried as well.
+    """
+    date_format = guess_datetime_format(sample)
+    if date_format is not None:
+        return date_format
+    
+    for candidate in _DATETIME_FORMATS:
+        try:
+            datetime.strptime(sample, candidate)
+            return candidate
+        except ValueError:
+            continue
+    return None
 
 
 # ============================================================================
 # COLUMN RENAMING
 # ============================================================================
 
+_RENAME_MAP = {
+    # Core Session Info
+    'Unique ID': 'Session_ID',
+    'Status': 'Status',
+    'Course': 'Document_Type',
+    'Location': 'Location',
+
+    # Session Length
+    'Tutor Submitted Length': 'Actual_Session_Length',
+    
+    # Attendance
+    'Student Attendance': 'Attendance_Status',
+    'Session Feedback From Student': 'Student_Feedback',
+    
+    # Pre-Session (Agenda)
+    'Agenda - How confident do you feel about your writing assignment right now? (1="Not at all"; 5="Very")': 'Pre_Confidence',
+    'Agenda - Is this your first appointment?': 'Is_First_Appointment',
+    'Agenda - Please check one of the following boxes to help us determine the context of your visit.': 'Visit_Context',
+    'Agenda - Roughly speaking, what stage of the writing process are you in right now?': 'Writing_Stage',
+    'Agenda - What would you like to focus on during this appointment?': 'Focus_Area',
+    'Agenda - When is your paper due?': 'Paper_Due_Date',
+    
+    # Post-Session (Student Feedback) - UPDATED COLUMN NAMES (Penji changed format)
+    
+    # NEW FORMAT (current Penji export)
+    'Student - How confident do you feel about your writing assignment now that your meeting is over (1="Not at all"; 5="Very")?': 'Post_Confidence',
+    'Student - How satisfied are you with the help you received at the Writing Studio (1="extremely dissatisfied," 7="extremely satisfied")?': 'Overall_Satisfaction',
+    
+    # OLD FORMAT (for backward compatibility)
+    'Student - How confident do you feel about your writing assignment now that your meeting is over? (1="Not at all"; 5="Very")': 'Post_Confidence',
+    'Student - On a scale of 1-7 (1="extremely dissatisfied," 7="extremely satisfied"), how satisfied are you with the help you received at the Writing Studio?': 'Overall_Satisfaction',
+    
+    # These appear to still use old format
+    'Student - On a scale of 1-5 (1="not at all," 5="extremely well"), how well did you get along with your tutor?': 'Tutor_Rapport',
+    'Student - On a scale of 1-5 (1="not easy at all", 5="extremely easy"), how easy was it to use our website and scheduling software to schedule and attend your appointment?': 'Platform_Ease',
+    
+    # Session_Quality - This column may be missing in some exports
+    # OLD FORMAT (may be removed by Penji)
+    'Student - On a scale of 1-5 (1="very poorly", 5="very well"), how well would you say your appointment went?': 'Session_Quality',
+    
+    # Tutor Feedback
+    'Tutor - Overall, how well would you say that the consultation went?': 'Tutor_Session_Rating',
+
+    # Incentives
+    'Student - Were you offered any of the following incentives for today\'s visit? Please select any that apply.': 'Incentives_Offered'
+}
+
+
 def rename_columns(df):
     """
     Rename columns to be more concise and analysis-friendly.
@@ -99,65 +217,42 @@ def rename_columns(df):
     
     Handles both old and new Penji column name formats for backward compatibility.
     """
-    rename_map = {
-        # Core Session Info
-        'Unique ID': 'Session_ID',
-        'Status': 'Status',
-        'Course': 'Document_Type',
-        'Location': 'Location',
-
-        # Session Length
-        'Tutor Submitted Length': 'Actual_Session_Length',
-        
-        # Attendance
-        'Student Attendance': 'Attendance_Status',
-        'Session Feedback From Student': 'Student_Feedback',
-        
-        # Pre-Session (Agenda)
-        'Agenda - How confident do you feel about your writing assignment right now? (1="Not at all"; 5="Very")': 'Pre_Confidence',
-        'Agenda - Is this your first appointment?': 'Is_First_Appointment',
-        'Agenda - Please check one of the following boxes to help us determine the context of your visit.': 'Visit_Context',
-        'Agenda - Please check one of the following boxes to help us determine the context of your visit.': 'Visit_Context',
-        'Agenda - Roughly speaking, what stage of the writing process are you in right now?': 'Writing_Stage',
-        'Agenda - What would you like to focus on during this appointment?': 'Focus_Area',
-        'Agenda - When is your paper due?': 'Paper_Due_Date',
-        
-        # Post-Session (Student Feedback) - UPDATED COLUMN NAMES (Penji changed format)
-        
-        # NEW FORMAT (current Penji export)
-        'Student - How confident do you feel about your writing assignment now that your meeting is over (1="Not at all"; 5="Very")?': 'Post_Confidence',
-        'Student - How satisfied are you with the help you received at the Writing Studio (1="extremely dissatisfied," 7="extremely satisfied")?': 'Overall_Satisfaction',
-        
-        # OLD FORMAT (for backward compatibility)
-        'Student - How confident do you feel about your writing assignment now that your meeting is over? (1="Not at all"; 5="Very")': 'Post_Confidence',
-        'Student - On a scale of 1-7 (1="extremely dissatisfied," 7="extremely satisfied"), how satisfied are you with the help you received at the Writing Studio?': 'Overall_Satisfaction',
-        
-        # These appear to still use old format
-        'Student - On a scale of 1-5 (1="not at all," 5="extremely well"), how well did you get along with your tutor?': 'Tutor_Rapport',
-        'Student - On a scale of 1-5 (1="not easy at all", 5="extremely easy"), how easy was it to use our website and scheduling software to schedule and attend your appointment?': 'Platform_Ease',
-        
-        # Session_Quality - This column may be missing in some exports
-        # OLD FORMAT (may be removed by Penji)
-        'Student - On a scale of 1-5 (1="very poorly", 5="very well"), how well would you say your appointment went?': 'Session_Quality',
-        
-        # Tutor Feedback
-        'Tutor - Overall, how well would you say that the consultation went?': 'Tutor_Session_Rating',
+    df_renamed = df.copy()
+    rename_count = _rename_columns_inplace(df_renamed)
+    return df_renamed, rename_count
 
-        # Incentives
-        'Student - Were you offered any of the following incentives for today\'s visit? Please select any that apply.': 'Incentives_Offered'
-    }
-    
+
+def _rename_columns_inplace(df):
+    """Rename columns in place (see rename_columns). Returns the number renamed."""
     # Only rename columns that exist
-    existing_renames = {old: new for old, new in rename_map.items() if old in df.columns}
-    df_renamed = df.rename(columns=existing_renames)
+    existing_renames = {old: new for old, new in _RENAME_MAP.items() if old in df.columns}
+    df.rename(columns=existing_renames, inplace=True)
 
-    return df_renamed, len(existing_renames)
+    return len(existing_renames)
 
 
 # ============================================================================
 # TEXT TO NUMERIC CONVERSION
 # ============================================================================
 
+# Tutor Session Rating conversion map
+# Based on the question: "Overall, how well would you say that the consultation went?"
+# Actual values from Penji: "It went extremely well", "It went very well", etc.
+_TUTOR_RATING_MAP = {
+    'It went extremely well': 5,
+    'It went very well': 4,
+    'It went moderately well': 3,
+    'It went somewhat well': 2,
+    "It didn't go well at all": 1,
+    # Case-insensitive variants (lowercase)
+    'it went extremely well': 5,
+    'it went very well': 4,
+    'it went moderately well': 3,
+    'it went somewhat well': 2,
+    "it didn't go well at all": 1
+}
+
+
 def convert_text_ratings_to_numeric(df):
     """
     Convert text-based rating responses to numeric values.
@@ -167,27 +262,15 @@ def convert_text_ratings_to_numeric(df):
     2. Student feedback fields: Numeric prefix format like "5 - Very well"
     """
     df_converted = df.copy()
+    _convert_text_ratings_to_numeric_inplace(df_converted)
+    return df_converted
 
-    # Tutor Session Rating conversion map
-    # Based on the question: "Overall, how well would you say that the consultation went?"
-    # Actual values from Penji: "It went extremely well", "It went very well", etc.
-    tutor_rating_map = {
-        'It went extremely well': 5,
-        'It went very well': 4,
-        'It went moderately well': 3,
-        'It went somewhat well': 2,
-        "It didn't go well at all": 1,
-        # Case-insensitive variants (lowercase)
-        'it went extremely well': 5,
-        'it went very well': 4,
-        'it went moderately well': 3,
-        'it went somewhat well': 2,
-        "it didn't go well at all": 1
-    }
 
+def _convert_text_ratings_to_numeric_inplace(df_converted):
+    """Convert text ratings to numbers in place (see convert_text_ratings_to_numeric)."""
     if 'Tutor_Session_Rating' in df_converted.columns:
         # Convert text to numeric using the mapping
-        df_converted['Tutor_Session_Rating'] = df_converted['Tutor_Session_Rating'].map(tutor_rating_map)
+        df_converted['Tutor_Session_Rating'] = df_converted['Tutor_Session_Rating'].map(_TUTOR_RATING_MAP)
         # Any unmapped values will become NaN (which is fine for data quality)
 
     # Extract numeric values from student feedback fields
@@ -197,13 +280,38 @@ def convert_text_ratings_to_numeric(df):
 
     for field in fields_to_extract:
         if field in df_converted.columns:
-            # Extract number from beginning of string (before the " - " separator)
-            # Use regex to extract digits at the start, handling various formats
-            df_converted[field] = df_converted[field].astype(str).str.extract(r'^(\d+)', expand=False)
-            # Convert to numeric, any non-numeric becomes NaN
-            df_converted[field] = pd.to_numeric(df_converted[field], errors='coerce')
+            df_converted[field] = _extract_leading_number(df_converted[field])
 
-    return df_converted
+
+# Leading integer of a "5 - Very well" style answer
+_LEADING_INT_RE = re.compile(r'^(\d+)')
+
+
+def _extract_leading_number(series):
+    """
+    Extract the number at the start of each value ("5 - Very well" → 5), NaN if none.
+    
+    A survey column only holds a handful of distinct answers, so the regex
+    runs once per distinct value and the results are broadcast back by code.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        # Empty or all-NaN: nothing to broadcast
+        return pd.to_numeric(series.astype(str).str.extract(_LEADING_INT_RE, expand=False), errors='coerce')
+    
+    # Extract digits at the start (before the " - " separator); any
+    # non-numeric answer becomes NaN
+    numbers = pd.to_numeric(
+        pd.Series(uniques, dtype=object).astype(str).str.extract(_LEADING_INT_RE, expand=False),
+        errors='coerce'
+    ).to_numpy()
+    
+    values = numbers[codes]
+    missing = codes < 0
+    if missing.any():
+        values = values.astype('float64')
+        values[missing] = np.nan
+    return pd.Series(values, index=series.index)
 
 
 # ============================================================================
@@ -221,9 +329,14 @@ def simplify_location(df):
     Returns: dataframe with simplified Location column
     """
     df_simplified = df.copy()
-    
+    _simplify_location_inplace(df_simplified)
+    return df_simplified
+
+
+def _simplify_location_inplace(df_simplified):
+    """Simplify the Location column in place (see simplify_location)."""
     if 'Location' not in df_simplified.columns:
-        return df_simplified
+        return
     
     # Define mapping patterns
     def map_location(location_str):
@@ -241,82 +354,88 @@ def simplify_location(df):
             return str(location_str)
     
     df_simplified['Location'] = df_simplified['Location'].apply(map_location)
-    
-    return df_simplified
 
 
 # ============================================================================
 # COLUMN REMOVAL
 # ============================================================================
 
+_USELESS_COLUMNS = (
+    # Always the same value (no variation)
+    'Appointment Type',  # Always "40min 1-on-1"
+    'Kind',              # Always "1-on-1"
+    'Session_Kind',      # Duplicate of above
+
+    # Obsolete free-text course field (being removed from intake form)
+    'Agenda - For which course are you writing this document? (If not applicable, write "N/A")',
+    'Course_Subject',  # In case it was already renamed
+
+    # Redundant after datetime merge
+    'Requested At Date',
+    'Requested At Time',
+    'Requested Start At Date',
+    'Requested Start At Time',
+    'Requested End At Date',
+    'Requested End At Time',
+    'Scheduled Start At Date',
+    'Scheduled Start At Time',
+    'Scheduled End At Date',
+    'Scheduled End At Time',
+    'Started At Date',
+    'Started At Time',
+    'Ended At Date',
+    'Ended At Time',
+    'Cancelled At Date',
+    'Cancelled At Time',
+
+    # Always 0.67 (40 minutes)
+    'Requested Length',
+
+    # Don't matter for analysis
+    'Source Kind',
+    'Booking Flow',
+    'Booking_Source',
+    'Booking_Method',
+
+    # Not useful
+    'Student Attendance Reason',
+    'Attendance_Reason',
+
+    # Useless columns
+    'Recurrence',
+    'Section',
+    'Session Feedback From Tutor',  # Generated/blank column, duplicate of Session_Feedback_From_Tutor
+    'Agenda - If you are meeting a Writing Consultant in-person, would you like to meet in a sensory-friendly, Low Distraction Room (LDR) if it is available?',
+    'Agenda - If you have access to any rubrics or assignment sheets, please attach them here.',
+    'Agenda - Please attach any assignment sheets, written directions, or rubrics for your paper.',
+    'Agenda - Please upload your paper here.',
+    'Tutor - Was this a mock or test consultation?',
+
+    # Text feedback fields - can't run metrics on text data
+    'Tutor - Please provide a brief overview of the topics discussed or issues addressed during your consultation.',  # Session_Feedback_From_Tutor
+    'Agenda - Is there anything else you\'d like to share?',  # 52% filled but not useful
+    'Cancel Reason',  # 12.9% - not useful
+    'Student - Please share any comments that you\'d like your tutor to see.',  # 3.6% - Student_Comments_Public
+    'Student - Please share any obstacles, disappointments, or problems that you encountered during your consultation at the Writing Studio.',  # Student_Issues - low fill
+)
+
+
 def remove_useless_columns(df):
     """
     Remove columns that don't add value to analysis.
     """
-    columns_to_remove = [
-        # Always the same value (no variation)
-        'Appointment Type',  # Always "40min 1-on-1"
-        'Kind',              # Always "1-on-1"
-        'Session_Kind',      # Duplicate of above
-
-        # Obsolete free-text course field (being removed from intake form)
-        'Agenda - For which course are you writing this document? (If not applicable, write "N/A")',
-        'Course_Subject',  # In case it was already renamed
-
-        # Redundant after datetime merge
-        'Requested At Date',
-        'Requested At Time',
-        'Requested Start At Date',
-        'Requested Start At Time',
-        'Requested End At Date',
-        'Requested End At Time',
-        'Scheduled Start At Date',
-        'Scheduled Start At Time',
-        'Scheduled End At Date',
-        'Scheduled End At Time',
-        'Started At Date',
-        'Started At Time',
-        'Ended At Date',
-        'Ended At Time',
-        'Cancelled At Date',
-        'Cancelled At Time',
-
-        # Always 0.67 (40 minutes)
-        'Requested Length',
-
-        # Don't matter for analysis
-        'Source Kind',
-        'Booking Flow',
-        'Booking_Source',
-        'Booking_Method',
-
-        # Not useful
-        'Student Attendance Reason',
-        'Attendance_Reason',
-
-        # Useless columns
-        'Recurrence',
-        'Section',
-        'Session Feedback From Tutor',  # Generated/blank column, duplicate of Session_Feedback_From_Tutor
-        'Agenda - If you are meeting a Writing Consultant in-person, would you like to meet in a sensory-friendly, Low Distraction Room (LDR) if it is available?',
-        'Agenda - If you have access to any rubrics or assignment sheets, please attach them here.',
-        'Agenda - Please attach any assignment sheets, written directions, or rubrics for your paper.',
-        'Agenda - Please upload your paper here.',
-        'Tutor - Was this a mock or test consultation?',
-
-        # Text feedback fields - can't run metrics on text data
-        'Tutor - Please provide a brief overview of the topics discussed or issues addressed during your consultation.',  # Session_Feedback_From_Tutor
-        'Agenda - Is there anything else you\'d like to share?',  # 52% filled but not useful
-        'Cancel Reason',  # 12.9% - not useful
-        'Student - Please share any comments that you\'d like your tutor to see.',  # 3.6% - Student_Comments_Public
-        'Student - Please share any obstacles, disappointments, or problems that you encountered during your consultation at the Writing Studio.',  # Student_Issues - low fill
-    ]
-    
+    df_clean = df.copy()
+    removed_cols = _remove_useless_columns_inplace(df_clean)
+    return df_clean, removed_cols
+
+
+def _remove_useless_columns_inplace(df):
+    """Drop the useless columns in place (see remove_useless_columns). Returns the dropped names."""
     # Only remove columns that exist
-    existing_removes = [col for col in columns_to_remove if col in df.columns]
-    df_clean = df.drop(columns=existing_removes, errors='ignore')
+    existing_removes = [col for col in _USELESS_COLUMNS if col in df.columns]
+    df.drop(columns=existing_removes, errors='ignore', inplace=True)
     
-    return df_clean, existing_removes
+    return existing_removes
 
 
 # ============================================================================
@@ -329,7 +448,12 @@ def standardize_data_types(df):
     Handles NaN gracefully throughout.
     """
     df_typed = df.copy()
-    
+    _standardize_data_types_inplace(df_typed)
+    return df_typed
+
+
+def _standardize_data_types_inplace(df_typed):
+    """Convert column dtypes in place (see standardize_data_types)."""
     # Numeric columns (ratings, lengths)
     numeric_columns = [
         'Actual_Session_Length',
@@ -366,8 +490,6 @@ def standardize_data_types(df):
             df_typed[col] = df_typed[col].fillna('').astype(str)
             # But mark truly empty as NaN for analysis purposes
             df_typed[col] = df_typed[col].replace('', np.nan)
-    
-    return df_typed
 
 
 # ============================================================================
@@ -379,14 +501,17 @@ def create_calculated_fields(df):
     Create useful derived fields for analysis.
     """
     df_calc = df.copy()
-    
+    _create_calculated_fields_inplace(df_calc)
+    return df_calc
+
+
+def _create_calculated_fields_inplace(df_calc):
+    """Add the derived columns in place (see create_calculated_fields)."""
     # Booking lead time (how far in advance they booked)
     if 'Booking_DateTime' in df_calc.columns and 'Appointment_DateTime' in df_calc.columns:
-        df_calc['Booking_Lead_Time_Hours'] = (
-            (df_calc['Appointment_DateTime'] - df_calc['Booking_DateTime'])
-            .dt.total_seconds() / 3600
-        )
-        df_calc['Booking_Lead_Time_Days'] = df_calc['Booking_Lead_Time_Hours'] / 24
+        lead_hours = _hours_between(df_calc['Booking_DateTime'], df_calc['Appointment_DateTime'])
+        df_calc['Booking_Lead_Time_Hours'] = lead_hours
+        df_calc['Booking_Lead_Time_Days'] = lead_hours / 24
     
     # Confidence change (pre to post)
     if 'Pre_Confidence' in df_calc.columns and 'Post_Confidence' in df_calc.columns:
@@ -394,23 +519,30 @@ def create_calculated_fields(df):
     
     # Actual session duration (if we have actual start/end times)
     if 'Actual_Start_DateTime' in df_calc.columns and 'Actual_End_DateTime' in df_calc.columns:
-        df_calc['Calculated_Session_Length'] = (
-            (df_calc['Actual_End_DateTime'] - df_calc['Actual_Start_DateTime'])
-            .dt.total_seconds() / 3600
+        df_calc['Calculated_Session_Length'] = _hours_between(
+            df_calc['Actual_Start_DateTime'], df_calc['Actual_End_DateTime']
         )
     
     # Flag: First-time student (convert yes/no to boolean)
     if 'Is_First_Appointment' in df_calc.columns:
-        df_calc['Is_First_Timer'] = df_calc['Is_First_Appointment'].str.lower().isin(['yes', 'y', 'true'])
+        first_appointment = df_calc['Is_First_Appointment']
+        if isinstance(first_appointment.dtype, pd.CategoricalDtype):
+            # Check the few categories, then look rows up by code (-1 = missing → False)
+            truthy = first_appointment.cat.categories.str.lower().isin(['yes', 'y', 'true'])
+            df_calc['Is_First_Timer'] = np.append(truthy, False)[first_appointment.cat.codes]
+        else:
+            df_calc['Is_First_Timer'] = first_appointment.str.lower().isin(['yes', 'y', 'true'])
     
     # Academic calendar fields (semester, academic year)
     if 'Appointment_DateTime' in df_calc.columns:
         # Import here to avoid circular imports
         from src.utils.academic_calendar import detect_semester, get_academic_year, get_semester_label
 
-        df_calc['Semester'] = df_calc['Appointment_DateTime'].apply(detect_semester)
-        df_calc['Academic_Year'] = df_calc['Appointment_DateTime'].apply(get_academic_year)
-        df_calc['Semester_Label'] = df_calc['Appointment_DateTime'].apply(get_semester_label)
+        # The labels only depend on the day, so compute them once per distinct day
+        appointment_days = df_calc['Appointment_DateTime'].dt.normalize()
+        df_calc['Semester'] = _apply_per_unique(appointment_days, detect_semester)
+        df_calc['Academic_Year'] = _apply_per_unique(appointment_days, get_academic_year)
+        df_calc['Semester_Label'] = _apply_per_unique(appointment_days, get_semester_label)
 
     # Incentive boolean flags for research analysis
     if 'Incentives_Offered' in df_calc.columns:
@@ -424,7 +556,32 @@ def create_calculated_fields(df):
         # Incentivized = either extra credit OR class required
         df_calc['Incentivized'] = df_calc['Extra_Credit'] | df_calc['Class_Required']
 
-    return df_calc
+
+def _hours_between(start, end):
+    """
+    Hours from start to end as a float array (NaN where either is NaT).
+    
+    Same values as (end - start).dt.total_seconds() / 3600, computed on the
+    raw datetime64 arrays without building intermediate Series.
+    """
+    hours = (end.to_numpy() - start.to_numpy()) / np.timedelta64(1, 's')
+    hours /= 3600
+    return hours
+
+
+def _apply_per_unique(series, func):
+    """
+    Same result as series.apply(func), calling func once per distinct value.
+    
+    Missing values are passed to func once as well, like .apply() does.
+    """
+    if series.empty:
+        return series.apply(func)
+    
+    codes, uniques = pd.factorize(series)
+    # Code -1 (missing) picks the last entry
+    results = np.array([func(value) for value in uniques] + [func(pd.NaT)], dtype=object)
+    return pd.Series(results[codes], index=series.index).infer_objects()
 
 
 # ============================================================================
@@ -437,14 +594,17 @@ def escape_excel_formulas(df):
     Prepends single quote to cells starting with - or =
     """
     df_escaped = df.copy()
-    
+    _escape_excel_formulas_inplace(df_escaped)
+    return df_escaped
+
+
+def _escape_excel_formulas_inplace(df_escaped):
+    """Escape formula-like text cells in place (see escape_excel_formulas)."""
     # Apply to all object/string columns
     for col in df_escaped.select_dtypes(include=['object']).columns:
         df_escaped[col] = df_escaped[col].apply(
             lambda x: f"'{x}" if isinstance(x, str) and len(x) > 0 and x[0] in ('-', '=') else x
         )
-    
-    return df_escaped
 
 
 # ============================================================================
@@ -465,21 +625,21 @@ def remove_outliers(df, column='Actual_Session_Length', method='iqr'):
         return df, {'removed_count': 0, 'method': 'column_not_found'}
     
     original_count = len(df)
-    values = df[column].dropna()
+    # One float buffer for the quantiles and the filter mask
+    lengths = df[column].to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(lengths)
     
-    if len(values) == 0:
+    if missing.all():
         return df, {'removed_count': 0, 'method': 'no_data'}
     
     if method == 'iqr':
-        Q1 = values.quantile(0.25)
-        Q3 = values.quantile(0.75)
+        Q1, Q3 = np.nanpercentile(lengths, [25, 75])
         IQR = Q3 - Q1
         lower_bound = max(0.05, Q1 - 1.5 * IQR)  # At least 3 minutes
         upper_bound = Q3 + 1.5 * IQR
         
     elif method == 'percentile':
-        lower_bound = values.quantile(0.05)
-        upper_bound = values.quantile(0.95)
+        lower_bound, upper_bound = np.nanpercentile(lengths, [5, 95])
         
     elif method == 'cap':
         lower_bound = 0.05  # 3 minutes
@@ -490,8 +650,8 @@ def remove_outliers(df, column='Actual_Session_Length', method='iqr'):
     
     # Filter data
     df_clean = df[
-        (df[column].isna()) |  # Keep NaN values
-        ((df[column] >= lower_bound) & (df[column] <= upper_bound))
+        missing |  # Keep NaN values
+        ((lengths >= lower_bound) & (lengths <= upper_bound))
     ].copy()
     
     removed_count = original_count - len(df_clean)
@@ -522,18 +682,17 @@ def validate_data_quality(df):
     issues = []
     warnings_list = []
     
-    # Check session lengths (only non-NaN values)
+    # Check session lengths (NaN compares False, so missing values never count)
     if 'Actual_Session_Length' in df.columns:
-        valid_lengths = df['Actual_Session_Length'].dropna()
+        lengths = df['Actual_Session_Length'].to_numpy(dtype='float64', na_value=np.nan)
         
-        if len(valid_lengths) > 0:
-            long_sessions = valid_lengths[valid_lengths > 3]
-            if len(long_sessions) > 0:
-                issues.append(f"⚠️ Found {len(long_sessions)} sessions longer than 3 hours (possible data error)")
-            
-            short_sessions = valid_lengths[valid_lengths < 0.05]  # Less than 3 minutes
-            if len(short_sessions) > 0:
-                issues.append(f"⚠️ Found {len(short_sessions)} sessions shorter than 3 minutes (possible data error)")
+        long_sessions = np.count_nonzero(lengths > 3)
+        if long_sessions > 0:
+            issues.append(f"⚠️ Found {long_sessions} sessions longer than 3 hours (possible data error)")
+        
+        short_sessions = np.count_nonzero(lengths < 0.05)  # Less than 3 minutes
+        if short_sessions > 0:
+            issues.append(f"⚠️ Found {short_sessions} sessions shorter than 3 minutes (possible data error)")
     
     # Check satisfaction scores are in valid ranges
     score_checks = [
@@ -548,11 +707,11 @@ def validate_data_quality(df):
     
     for col, min_val, max_val in score_checks:
         if col in df.columns:
-            valid_scores = df[col].dropna()
-            invalid = valid_scores[(valid_scores < min_val) | (valid_scores > max_val)]
+            scores = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            invalid = np.count_nonzero((scores < min_val) | (scores > max_val))
             
-            if len(invalid) > 0:
-                issues.append(f"⚠️ Found {len(invalid)} {col} scores outside {min_val}-{max_val} range")
+            if invalid > 0:
+                issues.append(f"⚠️ Found {invalid} {col} scores outside {min_val}-{max_val} range")
     
     # Check for future appointments (might be scheduled sessions, not errors)
     if 'Appointment_DateTime' in df.columns:
@@ -561,14 +720,13 @@ def validate_data_quality(df):
             warnings_list.append(f"ℹ️ Found {len(future_appts)} future appointments (likely scheduled sessions)")
     
     # Report on missing critical data (informational, not errors)
-    critical_cols = ['Attendance_Status', 'Document_Type', 'Actual_Session_Length']
-    for col in critical_cols:
-        if col in df.columns:
-            missing_count = df[col].isna().sum()
-            missing_pct = (missing_count / len(df)) * 100
-            
-            if missing_pct > 20:
-                warnings_list.append(f"ℹ️ {col}: {missing_pct:.1f}% missing data ({missing_count} rows)")
+    critical_cols = [col for col in ['Attendance_Status', 'Document_Type', 'Actual_Session_Length'] if col in df.columns]
+    missing_counts = df[critical_cols].isna().sum().to_numpy()
+    for col, missing_count in zip(critical_cols, missing_counts):
+        missing_pct = (missing_count / len(df)) * 100 if len(df) > 0 else 0
+        
+        if missing_pct > 20:
+            warnings_list.append(f"ℹ️ {col}: {missing_pct:.1f}% missing data ({missing_count} rows)")
     
     return issues, warnings_list
 
@@ -577,6 +735,33 @@ def validate_data_quality(df):
 # MISSING VALUE ANALYSIS (CONTEXT-AWARE)
 # ============================================================================
 
+# Missing-value field categories and what an empty value means for each
+_CONDITIONAL_FIELDS = {
+    'Cancellation_Reason': 'Only applies to cancelled sessions',
+    'Student_Issues': 'Optional - students only fill if they had problems',
+    'Student_Comments_For_Tutor': 'Optional feedback field',
+    'Student_Comments_Public': 'Optional feedback field',
+    'Incentives_Offered': 'Only applies if incentives were offered',
+    'Paper_Due_Date': 'Optional - not all assignments have fixed deadlines',
+}
+
+_CRITICAL_FIELDS = {
+    'Session_ID': 'Required - should never be missing',
+    'Appointment_DateTime': 'Required - should never be missing',
+    'Attendance_Status': 'Should be filled for all sessions',
+    'Actual_Session_Length': 'Should be filled by tutor',
+    'Status': 'Required - session status',
+}
+
+_IMPORTANT_FIELDS = {
+    'Pre_Confidence': 'Pre-session survey - not always completed',
+    'Post_Confidence': 'Post-session survey - not always completed',
+    'Focus_Area': 'Important for understanding session goals',
+    'Writing_Stage': 'Helpful for tracking student progress',
+    'Visit_Context': 'Useful for categorizing sessions',
+}
+
+
 def analyze_missing_values(df):
     """
     Smart missing value analysis that understands context.
@@ -589,50 +774,24 @@ def analyze_missing_values(df):
     """
     missing_report = {}
     
-    # Define field categories and expectations
-    conditional_fields = {
-        'Cancellation_Reason': 'Only applies to cancelled sessions',
-        'Student_Issues': 'Optional - students only fill if they had problems',
-        'Student_Comments_For_Tutor': 'Optional feedback field',
-        'Student_Comments_Public': 'Optional feedback field',
-        'Incentives_Offered': 'Only applies if incentives were offered',
-        'Paper_Due_Date': 'Optional - not all assignments have fixed deadlines',
-    }
-    
-    critical_fields = {
-        'Session_ID': 'Required - should never be missing',
-        'Appointment_DateTime': 'Required - should never be missing',
-        'Attendance_Status': 'Should be filled for all sessions',
-        'Actual_Session_Length': 'Should be filled by tutor',
-        'Status': 'Required - session status',
-    }
-    
-    important_fields = {
-        'Pre_Confidence': 'Pre-session survey - not always completed',
-        'Post_Confidence': 'Post-session survey - not always completed',
-        'Focus_Area': 'Important for understanding session goals',
-        'Writing_Stage': 'Helpful for tracking student progress',
-        'Visit_Context': 'Useful for categorizing sessions',
-    }
-    
-    # Analyze each column
-    for col in df.columns:
-        missing_count = df[col].isna().sum()
+    # Analyze each column (all missing counts in one pass)
+    missing_counts = df.isna().sum().to_numpy()
+    for col, missing_count in zip(df.columns, missing_counts):
         if missing_count > 0:
             missing_pct = (missing_count / len(df)) * 100
             
             # Categorize the missing data
-            if col in conditional_fields:
+            if col in _CONDITIONAL_FIELDS:
                 category = 'expected'
-                explanation = conditional_fields[col]
+                explanation = _CONDITIONAL_FIELDS[col]
                 severity = 'ok'
-            elif col in critical_fields:
+            elif col in _CRITICAL_FIELDS:
                 category = 'critical'
-                explanation = critical_fields[col]
+                explanation = _CRITICAL_FIELDS[col]
                 severity = 'high'
-            elif col in important_fields:
+            elif col in _IMPORTANT_FIELDS:
                 category = 'concerning'
-                explanation = important_fields[col]
+                explanation = _IMPORTANT_FIELDS[col]
                 severity = 'medium' if missing_pct > 30 else 'low'
             else:
                 category = 'optional'
@@ -655,17 +814,17 @@ def analyze_missing_values(df):
         total_sessions = len(df)
         
         # Count cancelled sessions
-        cancelled = df['Status'].str.lower().str.contains('cancel', na=False).sum()
+        cancelled = contains_lower(df['Status'], 'cancel').sum()
         
         # No-shows are marked as "Absent" in Attendance_Status (different from cancelled)
         if 'Attendance_Status' in df.columns:
-            no_show = df['Attendance_Status'].str.lower().str.contains('absent', na=False).sum()
+            no_show = contains_lower(df['Attendance_Status'], 'absent').sum()
             # Completed = marked as Present in Attendance_Status
-            completed = df['Attendance_Status'].str.lower().str.contains('present', na=False).sum()
+            completed = contains_lower(df['Attendance_Status'], 'present').sum()
         else:
             # Fallback to Status column if Attendance_Status doesn't exist
-            no_show = df['Status'].str.lower().str.contains('no.?show', na=False, regex=True).sum()
-            completed = df['Status'].str.lower().str.contains('complete|attended', na=False, regex=True).sum()
+            no_show = contains_lower(df['Status'], 'no.?show').sum()
+            completed = contains_lower(df['Status'], 'complete|attended').sum()
         
         context['cancellations'] = {
             'total_sessions': total_sessions,
@@ -683,7 +842,7 @@ def analyze_missing_values(df):
         context['student_issues'] = {
             'sessions_with_issues': has_issues,
             'sessions_without_issues': len(df) - has_issues,
-            'issue_rate': round((has_issues / len(df)) * 100, 1)
+            'issue_rate': round((has_issues / len(df)) * 100, 1) if len(df) > 0 else 0
         }
     
     # Survey completion context
@@ -693,9 +852,9 @@ def analyze_missing_values(df):
         both_completed = df[df['Pre_Confidence'].notna() & df['Post_Confidence'].notna()].shape[0]
         
         context['surveys'] = {
-            'pre_survey_completion_rate': round((pre_completed / len(df)) * 100, 1),
-            'post_survey_completion_rate': round((post_completed / len(df)) * 100, 1),
-            'both_surveys_completion_rate': round((both_completed / len(df)) * 100, 1)
+            'pre_survey_completion_rate': round((pre_completed / len(df)) * 100, 1) if len(df) > 0 else 0,
+            'post_survey_completion_rate': round((post_completed / len(df)) * 100, 1) if len(df) > 0 else 0,
+            'both_surveys_completion_rate': round((both_completed / len(df)) * 100, 1) if len(df) > 0 else 0
         }
     
     return {
@@ -719,14 +878,19 @@ def classify_course_column(df, courses_csv_path='courses.csv'):
     Note: Always creates Course_Code column, even if Course column is missing
     (handles older data that doesn't have course codes)
     """
-    import os
-    
     df_classified = df.copy()
+    _classify_course_column_inplace(df_classified, courses_csv_path)
+    return df_classified
+
+
+def _classify_course_column_inplace(df_classified, courses_csv_path='courses.csv'):
+    """Add the Course_Code column in place (see classify_course_column)."""
+    import os
     
     if 'Course' not in df_classified.columns:
         # Create empty Course_Code column for backward compatibility
         df_classified['Course_Code'] = np.nan
-        return df_classified
+        return
     
     # Build set of valid course codes from courses.csv
     valid_codes = set()
@@ -758,7 +922,7 @@ def classify_course_column(df, courses_csv_path='courses.csv'):
     # If no courses.csv found or no valid codes, create empty Course_Code column
     if not courses_csv_found or not valid_codes:
         df_classified['Course_Code'] = np.nan
-        return df_classified
+        return
     
     # Classify each Course value
     def classify(value):
@@ -772,8 +936,6 @@ def classify_course_column(df, courses_csv_path='courses.csv'):
         return np.nan  # It's an old document type, not a course
     
     df_classified['Course_Code'] = df_classified['Course'].apply(classify)
-    
-    return df_classified
 
 
 # ============================================================================
@@ -803,8 +965,11 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
         'original_cols': len(df.columns)
     }
 
+    # Copy the export once; every step below modifies df_clean in place
+    df_clean = df.copy()
+
     # Step 0: Clean column names (strip whitespace)
-    df_clean = clean_column_names(df)
+    _clean_column_names_inplace(df_clean)
     if log_actions:
         print("\n✓ Step 0: Cleaned column names (stripped whitespace)")
 
@@ -816,7 +981,7 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
             print(f"✓ Step 0.5: Recoded {xxxx_count} 'XXXX' values to 'N/A' in Course column")
 
     # Step 0.7: Classify Course column (separate real courses from document types)
-    df_clean = classify_course_column(df_clean)
+    _classify_course_column_inplace(df_clean)
     
     # Safety check: Ensure Course_Code column always exists (for backward compatibility)
     if 'Course_Code' not in df_clean.columns:
@@ -829,39 +994,39 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
         print(f"✓ Step 0.7: Classified courses ({course_code_count} real course codes found)")
 
     # Step 1: Merge date/time columns
-    df_clean = merge_datetime_columns(df_clean)
+    _merge_datetime_columns_inplace(df_clean)
     if log_actions:
         print("✓ Step 1: Merged date/time columns into datetime objects")
     
     # Step 2: Rename columns
-    df_clean, rename_count = rename_columns(df_clean)
+    rename_count = _rename_columns_inplace(df_clean)
     cleaning_log['renamed_columns'] = rename_count
     if log_actions:
         print(f"✓ Step 2: Renamed {rename_count} columns for clarity")
 
     # Step 2.5: Convert text ratings to numeric
-    df_clean = convert_text_ratings_to_numeric(df_clean)
+    _convert_text_ratings_to_numeric_inplace(df_clean)
     if log_actions:
         print("✓ Step 2.5: Converted text ratings to numeric values")
 
     # Step 3: Remove useless columns
-    df_clean, removed_cols = remove_useless_columns(df_clean)
+    removed_cols = _remove_useless_columns_inplace(df_clean)
     cleaning_log['removed_columns'] = removed_cols
     if log_actions:
         print(f"✓ Step 3: Removed {len(removed_cols)} unnecessary columns")
     
     # Step 4: Standardize data types
-    df_clean = standardize_data_types(df_clean)
+    _standardize_data_types_inplace(df_clean)
     if log_actions:
         print("✓ Step 4: Standardized data types (dates, numbers, categories, text)")
     
     # Step 5: Create calculated fields
-    df_clean = create_calculated_fields(df_clean)
+    _create_calculated_fields_inplace(df_clean)
     if log_actions:
         print("✓ Step 5: Created calculated fields (lead time, confidence change, etc.)")
     
     # Step 5.5: Simplify location names
-    df_clean = simplify_location(df_clean)
+    _simplify_location_inplace(df_clean)
     if log_actions:
         print("✓ Step 5.5: Simplified location names (CORD/ZOOM)")
     
@@ -877,30 +1042,33 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
         print("✓ Step 6: Skipped outlier removal (disabled)")
     
     # Step 7: Escape Excel formulas
-    df_clean = escape_excel_formulas(df_clean)
+    _escape_excel_formulas_inplace(df_clean)
     if log_actions:
         print("✓ Step 7: Escaped Excel formula characters (-, =)")
     
+    # The reports below are collected and written in one go
+    report_lines = []
+    
     # Step 8: Validate data quality
     issues, warnings_list = validate_data_quality(df_clean)
     cleaning_log['quality_issues'] = issues
     cleaning_log['quality_warnings'] = warnings_list
     
     if log_actions:
-        print("\n" + "="*80)
-        print("📊 DATA QUALITY REPORT")
-        print("="*80)
+        report_lines.append("\n" + "="*80)
+        report_lines.append("📊 DATA QUALITY REPORT")
+        report_lines.append("="*80)
         
         if issues:
             for issue in issues:
-                print(f"   {issue}")
+                report_lines.append(f"   {issue}")
         
         if warnings_list:
             for warning in warnings_list:
-                print(f"   {warning}")
+                report_lines.append(f"   {warning}")
         
         if not issues and not warnings_list:
-            print("   ✅ No data quality issues detected!")
+            report_lines.append("   ✅ No data quality issues detected!")
     
     # Step 9: Analyze missing values
     missing_analysis = analyze_missing_values(df_clean)
@@ -911,9 +1079,9 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
     cleaning_log['context'] = context
     
     if log_actions and missing_report:
-        print("\n" + "="*80)
-        print("📋 MISSING VALUE REPORT")
-        print("="*80)
+        report_lines.append("\n" + "="*80)
+        report_lines.append("📋 MISSING VALUE REPORT")
+        report_lines.append("="*80)
         
         # Separate by category
         critical = {k: v for k, v in missing_report.items() if v['category'] == 'critical'}
@@ -923,84 +1091,88 @@ def clean_scheduled_sessions(df, remove_outliers_flag=True, log_actions=True):
         
         # Critical missing data
         if critical:
-            print("\n🔴 CRITICAL MISSING DATA (should be filled):")
+            report_lines.append("\n🔴 CRITICAL MISSING DATA (should be filled):")
             for col, stats in sorted(critical.items(), key=lambda x: x[1]['percentage'], reverse=True):
-                print(f"   ⚠️ {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
-                print(f"      → {stats['explanation']}")
+                report_lines.append(f"   ⚠️ {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
+                report_lines.append(f"      → {stats['explanation']}")
         
         # Concerning missing data
         if concerning:
-            print("\n🟡 IMPORTANT BUT OFTEN MISSING (affects analysis quality):")
+            report_lines.append("\n🟡 IMPORTANT BUT OFTEN MISSING (affects analysis quality):")
             for col, stats in sorted(concerning.items(), key=lambda x: x[1]['percentage'], reverse=True):
-                print(f"   - {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
-                print(f"     → {stats['explanation']}")
+                report_lines.append(f"   - {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
+                report_lines.append(f"     → {stats['explanation']}")
         
         # Expected missing data (with context)
         if expected:
-            print("\n✅ EXPECTED MISSING DATA (not a problem):")
+            report_lines.append("\n✅ EXPECTED MISSING DATA (not a problem):")
             for col, stats in sorted(expected.items(), key=lambda x: x[1]['percentage'], reverse=True):
-                print(f"   - {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
-                print(f"     → {stats['explanation']}")
+                report_lines.append(f"   - {col}: {stats['percentage']:.1f}% missing ({stats['count']:,} rows)")
+                report_lines.append(f"     → {stats['explanation']}")
         
         # Optional fields (only show if significant)
         if optional:
             high_missing_optional = {k: v for k, v in optional.items() if v['percentage'] > 50}
             if high_missing_optional:
-                print("\nℹ️ OPTIONAL FIELDS (low priority):")
+                report_lines.append("\nℹ️ OPTIONAL FIELDS (low priority):")
                 for col, stats in sorted(high_missing_optional.items(), key=lambda x: x[1]['percentage'], reverse=True)[:5]:
-                    print(f"   - {col}: {stats['percentage']:.1f}% missing")
+                    report_lines.append(f"   - {col}: {stats['percentage']:.1f}% missing")
         
         # Show context information
         if context:
-            print("\n" + "="*80)
-            print("📊 SESSION STATISTICS")
-            print("="*80)
+            report_lines.append("\n" + "="*80)
+            report_lines.append("📊 SESSION STATISTICS")
+            report_lines.append("="*80)
             
             # Cancellation stats
             if 'cancellations' in context:
                 cancel_ctx = context['cancellations']
-                print("\n📅 Session Outcomes:")
-                print(f"   Total sessions: {cancel_ctx['total_sessions']:,}")
-                print(f"   Completed: {cancel_ctx['completed']:,} ({cancel_ctx['completion_rate']:.1f}%)")
-                print(f"   Cancelled: {cancel_ctx['cancelled']:,} ({cancel_ctx['cancellation_rate']:.1f}%)")
-                print(f"   No-shows: {cancel_ctx['no_show']:,} ({cancel_ctx['no_show_rate']:.1f}%)")
+                report_lines.append("\n📅 Session Outcomes:")
+                report_lines.append(f"   Total sessions: {cancel_ctx['total_sessions']:,}")
+                report_lines.append(f"   Completed: {cancel_ctx['completed']:,} ({cancel_ctx['completion_rate']:.1f}%)")
+                report_lines.append(f"   Cancelled: {cancel_ctx['cancelled']:,} ({cancel_ctx['cancellation_rate']:.1f}%)")
+                report_lines.append(f"   No-shows: {cancel_ctx['no_show']:,} ({cancel_ctx['no_show_rate']:.1f}%)")
             
             # Student issues stats
             if 'student_issues' in context:
                 issues_ctx = context['student_issues']
-                print("\n💬 Student Feedback:")
-                print(f"   Sessions with issues reported: {issues_ctx['sessions_with_issues']:,} ({issues_ctx['issue_rate']:.1f}%)")
-                print(f"   Sessions without issues: {issues_ctx['sessions_without_issues']:,}")
-                print("   → Low issue rate is a positive indicator!")
+                report_lines.append("\n💬 Student Feedback:")
+                report_lines.append(f"   Sessions with issues reported: {issues_ctx['sessions_with_issues']:,} ({issues_ctx['issue_rate']:.1f}%)")
+                report_lines.append(f"   Sessions without issues: {issues_ctx['sessions_without_issues']:,}")
+                report_lines.append("   → Low issue rate is a positive indicator!")
             
             # Survey completion stats
             if 'surveys' in context:
                 survey_ctx = context['surveys']
-                print("\n📝 Survey Completion Rates:")
-                print(f"   Pre-session survey: {survey_ctx['pre_survey_completion_rate']:.1f}%")
-                print(f"   Post-session survey: {survey_ctx['post_survey_completion_rate']:.1f}%")
-                print(f"   Both surveys completed: {survey_ctx['both_surveys_completion_rate']:.1f}%")
+                report_lines.append("\n📝 Survey Completion Rates:")
+                report_lines.append(f"   Pre-session survey: {survey_ctx['pre_survey_completion_rate']:.1f}%")
+                report_lines.append(f"   Post-session survey: {survey_ctx['post_survey_completion_rate']:.1f}%")
+                report_lines.append(f"   Both surveys completed: {survey_ctx['both_surveys_completion_rate']:.1f}%")
     
     # Final summary
     cleaning_log['final_rows'] = len(df_clean)
     cleaning_log['final_cols'] = len(df_clean.columns)
     
     if log_actions:
-        print("\n" + "="*80)
-        print("✅ CLEANING COMPLETE")
-        print("="*80)
-        print(f"   Final dataset: {len(df_clean):,} rows × {len(df_clean.columns)} columns")
-        print(f"   Removed: {cleaning_log['original_cols'] - cleaning_log['final_cols']} columns")
+        report_lines.append("\n" + "="*80)
+        report_lines.append("✅ CLEANING COMPLETE")
+        report_lines.append("="*80)
+        report_lines.append(f"   Final dataset: {len(df_clean):,} rows × {len(df_clean.columns)} columns")
+        report_lines.append(f"   Removed: {cleaning_log['original_cols'] - cleaning_log['final_cols']} columns")
         if remove_outliers_flag and 'outliers_removed' in cleaning_log:
-            print(f"   Removed: {cleaning_log['outliers_removed']['removed_count']} outlier rows")
-        print(f"   Missing data handled gracefully in {len(missing_report)} columns")
+            report_lines.append(f"   Removed: {cleaning_log['outliers_removed']['removed_count']} outlier rows")
+        report_lines.append(f"   Missing data handled gracefully in {len(missing_report)} columns")
         
         # Add cancellation rate to final summary
         if 'context' in cleaning_log and 'cancellations' in cleaning_log['context']:
             cancel_rate = cleaning_log['context']['cancellations']['cancellation_rate']
-            print(f"   Cancellation rate: {cancel_rate}%")
+            report_lines.append(f"   Cancellation rate: {cancel_rate}%")
         
-        print("="*80 + "\n")
+        report_lines.append("="*80 + "\n")
+        
+        report_text = "\n".join(report_lines) + "\n"
+        cleaning_log['report_text'] = report_text
+        sys.stdout.write(report_text)
     
     return df_clean, cleaning_log
 
@@ -1084,6 +1256,93 @@ def clean_data(df, mode='auto', remove_outliers=True, log_actions=True):
 # CONVENIENCE FUNCTION
 # ============================================================================
 
+# pandas.read_csv's default NA strings, so Arrow marks the same cells missing
+_CSV_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'
+]
+
+
+def _read_csv_header(csv_path):
+    """
+    Column names as pd.read_csv would give them.
+    
+    A UTF-8 BOM is dropped, blank names become 'Unnamed: <i>', and repeated
+    names get pandas' '.1', '.2', ... suffixes.
+    """
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), [])
+    
+    header = [col if col != '' else f"Unnamed: {i}" for i, col in enumerate(header)]
+    taken = set(header)
+    
+    names = []
+    counts = {}
+    for col in header:
+        count = counts.get(col, 0)
+        base = col
+        while count > 0:
+            counts[base] = count + 1
+            col = f"{base}.{count}"
+            # Skip suffixes that are already another column's name
+            count = count + 1 if col in taken else counts.get(col, 0)
+        names.append(col)
+        counts[col] = count + 1
+    return names
+
+
+def load_csv(csv_path):
+    """
+    Load a Penji CSV export with Arrow's multi-threaded parser.
+    
+    Gives the same frame as pd.read_csv: column names are deduplicated the
+    pandas way, anything Arrow would read as a date or time (the split
+    Date/Time columns, but also free-text answers that happen to look like
+    dates) stays text, and NA/boolean spellings follow pandas.
+    """
+    names = _read_csv_header(csv_path)
+    read_options = pacsv.ReadOptions(column_names=names, skip_rows=1)
+    
+    def read(column_types, include_columns=None):
+        return pacsv.read_csv(
+            csv_path,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types,
+                include_columns=include_columns,
+                null_values=_CSV_NA_VALUES,
+                true_values=['True', 'TRUE', 'true'],
+                false_values=['False', 'FALSE', 'false'],
+                strings_can_be_null=True
+            )
+        )
+    
+    # Arrow would otherwise infer date32/time32 for the split date and time columns
+    column_types = {col: pa.string() for col in names if col.strip().endswith((' Date', ' Time'))}
+    table = read(column_types)
+    
+    # Any other column Arrow parsed as a date/time is re-read as text
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        text = read({col: pa.string() for col in temporal}, include_columns=temporal)
+        for col in temporal:
+            table = table.set_column(table.schema.get_field_index(col), col, text.column(col))
+    
+    df = table.to_pandas()
+    
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            # All-empty column; pandas reads it as float NaN
+            df.isetitem(i, pd.Series(np.nan, index=df.index, dtype='float64'))
+        elif pa.types.is_boolean(field.type) and table.column(i).null_count:
+            # Nullable boolean columns come back holding None; pandas uses NaN
+            column = df.iloc[:, i].astype(object)
+            df.isetitem(i, column.where(column.notna(), np.nan))
+    
+    return df
+
+
 def quick_clean(csv_path, mode='auto', remove_outliers=True):
     """
     One-liner: Load CSV and clean in one step.
@@ -1091,5 +1350,5 @@ def quick_clean(csv_path, mode='auto', remove_outliers=True):
     Usage:
         df_clean, log = quick_clean('penji_export.csv')
     """
-    df = pd.read_csv(csv_path)
+    df = load_csv(csv_path)
     return clean_data(df, mode=mode, remove_outliers=remove_outliers, log_actions=True)
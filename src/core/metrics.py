@@ -1,7 +1,9 @@
 # src/core/metrics.py
 
+import numpy as np
 import pandas as pd
 from src.core.location_metrics import calculate_location_metrics
+from src.utils.text_matching import contains_lower
 
 # ============================================================================
 # BOOKING BEHAVIOR METRICS
@@ -21,41 +23,35 @@ def calculate_booking_metrics(df):
     if 'Booking_Lead_Time_Days' not in df.columns:
         return metrics
     
-    lead_times = df['Booking_Lead_Time_Days'].dropna()
+    lead_times = df['Booking_Lead_Time_Days'].to_numpy(dtype='float64', na_value=np.nan)
+    lead_times = lead_times[~np.isnan(lead_times)]
     
     if len(lead_times) == 0:
         return metrics
     
-    # Basic statistics
+    # Basic statistics (all percentiles in one pass)
+    p25, p75, p90, p95 = np.percentile(lead_times, [25, 75, 90, 95])
     metrics['lead_time_stats'] = {
         'mean': lead_times.mean(),
-        'median': lead_times.median(),
-        'std': lead_times.std(),
+        'median': np.median(lead_times),
+        'std': lead_times.std(ddof=1),
         'min': lead_times.min(),
         'max': lead_times.max(),
-        'p25': lead_times.quantile(0.25),
-        'p75': lead_times.quantile(0.75),
-        'p90': lead_times.quantile(0.90),
-        'p95': lead_times.quantile(0.95)
+        'p25': p25,
+        'p75': p75,
+        'p90': p90,
+        'p95': p95
     }
     
-    # Categorize booking times
-    def categorize_lead_time(days):
-        if pd.isna(days):
-            return 'Unknown'
-        elif days < 1:
-            return 'Same Day'
-        elif days < 2:
-            return '1 Day Ahead'
-        elif days < 4:
-            return '2-3 Days Ahead'
-        elif days < 8:
-            return '4-7 Days Ahead'
-        else:
-            return '7+ days ahead'
-    
-    categories = df['Booking_Lead_Time_Days'].apply(categorize_lead_time)
-    category_counts = categories.value_counts()
+    # Categorize booking times: <1, <2, <4, <8, 8+ days (NaN → 'Unknown')
+    lead_labels = np.array(
+        ['Same Day', '1 Day Ahead', '2-3 Days Ahead', '4-7 Days Ahead', '7+ days ahead', 'Unknown'],
+        dtype=object
+    )
+    days = df['Booking_Lead_Time_Days'].to_numpy(dtype='float64', na_value=np.nan)
+    label_idx = np.searchsorted([1, 2, 4, 8], days, side='right')
+    label_idx[np.isnan(days)] = len(lead_labels) - 1
+    category_counts = _bucket_counts(label_idx, lead_labels)
     category_pcts = (category_counts / len(df) * 100).round(1)
     
     metrics['lead_time_categories'] = {
@@ -66,6 +62,17 @@ def calculate_booking_metrics(df):
     return metrics
 
 
+def _bucket_counts(bucket_idx, labels):
+    """
+    Same as pd.Series(labels[bucket_idx]).value_counts(), without building the
+    per-row label Series: counting the small integer codes gives the same
+    counts and tie order, then the codes are swapped for their labels.
+    """
+    counts = pd.Series(bucket_idx).value_counts()
+    counts.index = labels[counts.index.to_numpy()]
+    return counts
+
+
 def calculate_time_patterns(df, date_col='Appointment_DateTime'):
     """
     Calculate session patterns by day of week and time of day.
@@ -81,13 +88,12 @@ def calculate_time_patterns(df, date_col='Appointment_DateTime'):
     if date_col not in df.columns:
         return metrics
     
-    df_temp = df.copy()
-    df_temp['Day_of_Week'] = df_temp[date_col].dt.day_name()
-    df_temp['Hour'] = df_temp[date_col].dt.hour
+    day_of_week = df[date_col].dt.day_name().rename('Day_of_Week')
+    hour = df[date_col].dt.hour.rename('Hour')
     
     # By day of week
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_counts = df_temp['Day_of_Week'].value_counts().reindex(day_order, fill_value=0)
+    day_counts = day_of_week.value_counts().reindex(day_order, fill_value=0)
     
     metrics['by_day_of_week'] = {
         'counts': day_counts.to_dict(),
@@ -96,7 +102,7 @@ def calculate_time_patterns(df, date_col='Appointment_DateTime'):
     }
     
     # By hour
-    hour_counts = df_temp['Hour'].value_counts().sort_index()
+    hour_counts = hour.value_counts().sort_index()
     
     metrics['by_hour'] = {
         'counts': hour_counts.to_dict(),
@@ -105,10 +111,19 @@ def calculate_time_patterns(df, date_col='Appointment_DateTime'):
     }
     
     # Heatmap data (day × hour)
-    heatmap = df_temp.groupby(['Day_of_Week', 'Hour']).size().unstack(fill_value=0)
-    heatmap = heatmap.reindex(day_order[:5], fill_value=0)  # Weekdays only
-    
-    metrics['by_day_and_hour'] = heatmap.to_dict()
+    # Columns are every hour seen on any day; rows are weekdays only
+    valid = hour.notna().to_numpy()
+    hour_values = hour.to_numpy()[valid]
+    weekday = df[date_col].dt.weekday.to_numpy()[valid].astype(np.int64)
+    hours_seen = np.unique(hour_values)
+    on_weekday = weekday < 5
+    cell = weekday[on_weekday] * len(hours_seen) + np.searchsorted(hours_seen, hour_values[on_weekday])
+    heatmap = np.bincount(cell, minlength=5 * len(hours_seen)).reshape(5, len(hours_seen))
+    
+    metrics['by_day_and_hour'] = {
+        h: {day: int(heatmap[i, j]) for i, day in enumerate(day_order[:5])}
+        for j, h in enumerate(hours_seen.tolist())
+    }
     
     return metrics
 
@@ -143,10 +158,10 @@ def calculate_attendance_by_location_metrics(df):
         return metrics
     
     # Create attendance status flags
-    df_temp = df.copy()
-    df_temp['Is_Present'] = df_temp['Attendance_Status'].str.lower().str.contains('present', na=False)
-    df_temp['Is_No_Show'] = df_temp['Attendance_Status'].str.lower().str.contains('absent', na=False)
-    df_temp['Is_Cancelled'] = df_temp['Status'].str.lower().str.contains('cancel', na=False)
+    df_temp = df[['Location']].copy()
+    df_temp['Is_Present'] = contains_lower(df['Attendance_Status'], 'present')
+    df_temp['Is_No_Show'] = contains_lower(df['Attendance_Status'], 'absent')
+    df_temp['Is_Cancelled'] = contains_lower(df['Status'], 'cancel')
     
     # Calculate metrics for each location
     by_location = {}
@@ -195,13 +210,17 @@ def calculate_attendance_metrics(df):
     """
     metrics = {}
     
+    # Outcome flags shared by the blocks below (empty if the column is missing)
+    is_no_show = contains_lower(df.get('Attendance_Status', pd.Series()), 'absent')
+    is_cancelled = contains_lower(df.get('Status', pd.Series()), 'cancel')
+    
     # Overall outcomes
     if 'Attendance_Status' in df.columns and 'Status' in df.columns:
         total = len(df)
         
-        completed = df['Attendance_Status'].str.lower().str.contains('present', na=False).sum()
-        no_show = df['Attendance_Status'].str.lower().str.contains('absent', na=False).sum()
-        cancelled = df['Status'].str.lower().str.contains('cancel', na=False).sum()
+        completed = contains_lower(df['Attendance_Status'], 'present').sum()
+        no_show = is_no_show.sum()
+        cancelled = is_cancelled.sum()
         
         metrics['overall'] = {
             'total_sessions': total,
@@ -216,31 +235,30 @@ def calculate_attendance_metrics(df):
     
     # By day of week
     if 'Appointment_DateTime' in df.columns and 'Attendance_Status' in df.columns:
-        df_temp = df.copy()
-        df_temp['Day_of_Week'] = df_temp['Appointment_DateTime'].dt.day_name()
-        df_temp['Is_No_Show'] = df_temp['Attendance_Status'].str.lower().str.contains('absent', na=False)
+        day_of_week = df['Appointment_DateTime'].dt.day_name()
         
         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
         no_show_by_day = {}
         
         for day in day_order:
-            day_data = df_temp[df_temp['Day_of_Week'] == day]
-            if len(day_data) > 0:
-                rate = (day_data['Is_No_Show'].sum() / len(day_data)) * 100
+            in_day = day_of_week == day
+            day_total = int(in_day.sum())
+            if day_total > 0:
+                rate = (is_no_show[in_day].sum() / day_total) * 100
                 no_show_by_day[day] = round(rate, 1)
         
         metrics['by_day'] = no_show_by_day
     
     # By semester
     if 'Semester_Label' in df.columns:
-        df_temp = df.copy()
-        df_temp['Is_No_Show'] = df_temp.get('Attendance_Status', pd.Series()).str.lower().str.contains('absent', na=False)
-        df_temp['Is_Cancelled'] = df_temp.get('Status', pd.Series()).str.lower().str.contains('cancel', na=False)
+        df_temp = df[['Semester_Label']].copy()
+        df_temp['Is_No_Show'] = is_no_show
+        df_temp['Is_Cancelled'] = is_cancelled
         
-        semester_metrics = df_temp.groupby('Semester_Label').agg({
-            'Is_No_Show': lambda x: round((x.sum() / len(x)) * 100, 1),
-            'Is_Cancelled': lambda x: round((x.sum() / len(x)) * 100, 1)
-        }).to_dict()
+        by_semester = df_temp.groupby('Semester_Label')[['Is_No_Show', 'Is_Cancelled']]
+        semester_metrics = (
+            by_semester.sum().div(by_semester.size(), axis=0) * 100
+        ).round(1).to_dict()
         
         metrics['by_semester'] = semester_metrics
     
@@ -265,45 +283,39 @@ def calculate_session_length_metrics(df):
     if 'Actual_Session_Length' not in df.columns:
         return metrics
     
-    lengths = df['Actual_Session_Length'].dropna()
+    lengths = df['Actual_Session_Length'].to_numpy(dtype='float64', na_value=np.nan)
+    lengths = lengths[~np.isnan(lengths)]
     
     if len(lengths) == 0:
         return metrics
     
     # Overall statistics (in minutes for readability)
+    p25, p75 = np.percentile(lengths, [25, 75])
     metrics['overall'] = {
         'mean_minutes': round(lengths.mean() * 60, 1),
-        'median_minutes': round(lengths.median() * 60, 1),
-        'std_minutes': round(lengths.std() * 60, 1),
+        'median_minutes': round(np.median(lengths) * 60, 1),
+        'std_minutes': round(lengths.std(ddof=1) * 60, 1),
         'min_minutes': round(lengths.min() * 60, 1),
         'max_minutes': round(lengths.max() * 60, 1),
-        'p25_minutes': round(lengths.quantile(0.25) * 60, 1),
-        'p75_minutes': round(lengths.quantile(0.75) * 60, 1)
+        'p25_minutes': round(p25 * 60, 1),
+        'p75_minutes': round(p75 * 60, 1)
     }
     
-    # Distribution buckets
-    def bucket_length(hours):
-        if pd.isna(hours):
-            return 'Unknown'
-        minutes = hours * 60
-        if minutes < 20:
-            return '<20 min'
-        elif minutes < 35:
-            return '20-35 min'
-        elif minutes < 45:
-            return '35-45 min (standard)'
-        elif minutes < 60:
-            return '45-60 min'
-        else:
-            return '60+ min'
-    
-    buckets = df['Actual_Session_Length'].apply(bucket_length)
-    metrics['distribution'] = buckets.value_counts().to_dict()
+    # Distribution buckets: <20, <35, <45, <60, 60+ minutes (NaN → 'Unknown')
+    bucket_labels = np.array(
+        ['<20 min', '20-35 min', '35-45 min (standard)', '45-60 min', '60+ min', 'Unknown'],
+        dtype=object
+    )
+    minutes = df['Actual_Session_Length'].to_numpy(dtype='float64', na_value=np.nan) * 60
+    bucket_idx = np.searchsorted([20, 35, 45, 60], minutes, side='right')
+    bucket_idx[np.isnan(minutes)] = len(bucket_labels) - 1
+    metrics['distribution'] = _bucket_counts(bucket_idx, bucket_labels).to_dict()
     
     # By tutor (top 10)
     if 'Tutor_Anon_ID' in df.columns:
         top_tutors = df['Tutor_Anon_ID'].value_counts().head(10).index
-        tutor_stats = df[df['Tutor_Anon_ID'].isin(top_tutors)].groupby('Tutor_Anon_ID')['Actual_Session_Length'].agg([
+        top_rows = df.loc[df['Tutor_Anon_ID'].isin(top_tutors), ['Tutor_Anon_ID', 'Actual_Session_Length']]
+        tutor_stats = top_rows.groupby('Tutor_Anon_ID')['Actual_Session_Length'].agg([
             ('mean_minutes', lambda x: round(x.mean() * 60, 1)),
             ('count', 'count')
         ]).to_dict()
@@ -1010,8 +1022,8 @@ def calculate_semester_trend_comparisons(df):
     # Attendance metrics by semester
     if 'Attendance_Status' in df.columns:
         df_temp = df.copy()
-        df_temp['Is_Present'] = df_temp['Attendance_Status'].str.lower().str.contains('present', na=False)
-        df_temp['Is_No_Show'] = df_temp['Attendance_Status'].str.lower().str.contains('absent', na=False)
+        df_temp['Is_Present'] = contains_lower(df_temp['Attendance_Status'], 'present')
+        df_temp['Is_No_Show'] = contains_lower(df_temp['Attendance_Status'], 'absent')
         
         att_by_sem = df_temp.groupby('Semester_Label').agg({
             'Is_Present': lambda x: round((x.sum() / len(x)) * 100, 1),
@@ -1058,6 +1070,46 @@ def calculate_semester_trend_comparisons(df):
 # INCENTIVE ANALYSIS METRICS
 # ============================================================================
 
+# (test name, subgroup with the incentive, subgroup without it)
+_INCENTIVE_COMPARISONS = [
+    ('incentivized_vs_not', 'incentivized', 'not_incentivized'),
+    ('class_required_vs_not', 'class_required', 'not_required'),
+    ('extra_credit_vs_not', 'extra_credit', 'no_extra_credit'),
+]
+
+
+def _rating_summary(values):
+    """Rounded mean/median/std and count for one incentive subgroup."""
+    return {
+        'mean': round(values.mean(), 2),
+        'median': round(values.median(), 2),
+        'std': round(values.std(), 2),
+        'count': len(values)
+    }
+
+
+def _incentive_ttests(groups):
+    """Welch t-tests for each incentive split that has at least two values per side."""
+    from scipy import stats
+
+    tests = {}
+
+    for name, with_key, without_key in _INCENTIVE_COMPARISONS:
+        if with_key not in groups:
+            continue
+        with_values, without_values = groups[with_key], groups[without_key]
+        if len(with_values) >= 2 and len(without_values) >= 2:
+            t_stat, p_value = stats.ttest_ind(with_values, without_values, equal_var=False)
+            tests[name] = {
+                't_statistic': round(t_stat, 3),
+                'p_value': round(p_value, 4),
+                'significant_at_05': p_value < 0.05,
+                'significant_at_01': p_value < 0.01
+            }
+
+    return tests
+
+
 def calculate_incentive_metrics(df):
     """
     Calculate metrics related to student incentives and their correlation
@@ -1111,68 +1163,23 @@ def calculate_incentive_metrics(df):
         }
     }
 
-    # Tutor ratings by incentive type
-    tutor_ratings = {}
-
-    # Extra credit vs no extra credit
-    extra_credit_ratings = df_completed[df_completed['Extra_Credit']]['Tutor_Session_Rating']
-    no_extra_credit_ratings = df_completed[~df_completed['Extra_Credit']]['Tutor_Session_Rating']
-
-    if len(extra_credit_ratings) > 0:
-        tutor_ratings['extra_credit'] = {
-            'mean': round(extra_credit_ratings.mean(), 2),
-            'median': round(extra_credit_ratings.median(), 2),
-            'std': round(extra_credit_ratings.std(), 2),
-            'count': len(extra_credit_ratings)
-        }
-
-    if len(no_extra_credit_ratings) > 0:
-        tutor_ratings['no_extra_credit'] = {
-            'mean': round(no_extra_credit_ratings.mean(), 2),
-            'median': round(no_extra_credit_ratings.median(), 2),
-            'std': round(no_extra_credit_ratings.std(), 2),
-            'count': len(no_extra_credit_ratings)
-        }
-
-    # Class required vs not required
-    class_required_ratings = df_completed[df_completed['Class_Required']]['Tutor_Session_Rating']
-    not_required_ratings = df_completed[~df_completed['Class_Required']]['Tutor_Session_Rating']
-
-    if len(class_required_ratings) > 0:
-        tutor_ratings['class_required'] = {
-            'mean': round(class_required_ratings.mean(), 2),
-            'median': round(class_required_ratings.median(), 2),
-            'std': round(class_required_ratings.std(), 2),
-            'count': len(class_required_ratings)
-        }
-
-    if len(not_required_ratings) > 0:
-        tutor_ratings['not_required'] = {
-            'mean': round(not_required_ratings.mean(), 2),
-            'median': round(not_required_ratings.median(), 2),
-            'std': round(not_required_ratings.std(), 2),
-            'count': len(not_required_ratings)
-        }
-
-    # Any incentive vs no incentive
-    incentivized_ratings = df_completed[df_completed['Incentivized']]['Tutor_Session_Rating']
-    not_incentivized_ratings = df_completed[~df_completed['Incentivized']]['Tutor_Session_Rating']
-
-    if len(incentivized_ratings) > 0:
-        tutor_ratings['incentivized'] = {
-            'mean': round(incentivized_ratings.mean(), 2),
-            'median': round(incentivized_ratings.median(), 2),
-            'std': round(incentivized_ratings.std(), 2),
-            'count': len(incentivized_ratings)
-        }
+    # Incentive flags, materialized once and reused for every subgroup
+    extra_credit = df_completed['Extra_Credit'].to_numpy(dtype=bool)
+    class_required = df_completed['Class_Required'].to_numpy(dtype=bool)
+    incentivized = df_completed['Incentivized'].to_numpy(dtype=bool)
+    incentive_groups = [
+        ('extra_credit', extra_credit),
+        ('no_extra_credit', ~extra_credit),
+        ('class_required', class_required),
+        ('not_required', ~class_required),
+        ('incentivized', incentivized),
+        ('not_incentivized', ~incentivized),
+    ]
 
-    if len(not_incentivized_ratings) > 0:
-        tutor_ratings['not_incentivized'] = {
-            'mean': round(not_incentivized_ratings.mean(), 2),
-            'median': round(not_incentivized_ratings.median(), 2),
-            'std': round(not_incentivized_ratings.std(), 2),
-            'count': len(not_incentivized_ratings)
-        }
+    # Tutor ratings by incentive type
+    ratings = df_completed['Tutor_Session_Rating']
+    rating_groups = {key: ratings[mask] for key, mask in incentive_groups}
+    tutor_ratings = {key: _rating_summary(values) for key, values in rating_groups.items() if len(values) > 0}
 
     metrics['tutor_rating_by_incentive'] = tutor_ratings
 
@@ -1184,156 +1191,30 @@ def calculate_incentive_metrics(df):
             'interpretation': 'Incentivized students have higher ratings' if diff > 0 else 'Incentivized students have lower ratings' if diff < 0 else 'No difference'
         }
 
-    # Student satisfaction ratings by incentive type
-    satisfaction_ratings = {}
-
-    # Filter to sessions with satisfaction data
-    df_with_satisfaction = df_completed[df_completed['Overall_Satisfaction'].notna()].copy()
-
-    if len(df_with_satisfaction) > 0:
-        # Extra credit vs no extra credit
-        extra_credit_satisfaction = df_with_satisfaction[df_with_satisfaction['Extra_Credit']]['Overall_Satisfaction']
-        no_extra_credit_satisfaction = df_with_satisfaction[~df_with_satisfaction['Extra_Credit']]['Overall_Satisfaction']
-
-        if len(extra_credit_satisfaction) > 0:
-            satisfaction_ratings['extra_credit'] = {
-                'mean': round(extra_credit_satisfaction.mean(), 2),
-                'median': round(extra_credit_satisfaction.median(), 2),
-                'std': round(extra_credit_satisfaction.std(), 2),
-                'count': len(extra_credit_satisfaction)
-            }
-
-        if len(no_extra_credit_satisfaction) > 0:
-            satisfaction_ratings['no_extra_credit'] = {
-                'mean': round(no_extra_credit_satisfaction.mean(), 2),
-                'median': round(no_extra_credit_satisfaction.median(), 2),
-                'std': round(no_extra_credit_satisfaction.std(), 2),
-                'count': len(no_extra_credit_satisfaction)
-            }
-
-        # Class required vs not required
-        class_required_satisfaction = df_with_satisfaction[df_with_satisfaction['Class_Required']]['Overall_Satisfaction']
-        not_required_satisfaction = df_with_satisfaction[~df_with_satisfaction['Class_Required']]['Overall_Satisfaction']
-
-        if len(class_required_satisfaction) > 0:
-            satisfaction_ratings['class_required'] = {
-                'mean': round(class_required_satisfaction.mean(), 2),
-                'median': round(class_required_satisfaction.median(), 2),
-                'std': round(class_required_satisfaction.std(), 2),
-                'count': len(class_required_satisfaction)
-            }
-
-        if len(not_required_satisfaction) > 0:
-            satisfaction_ratings['not_required'] = {
-                'mean': round(not_required_satisfaction.mean(), 2),
-                'median': round(not_required_satisfaction.median(), 2),
-                'std': round(not_required_satisfaction.std(), 2),
-                'count': len(not_required_satisfaction)
-            }
-
-        # Any incentive vs no incentive
-        incentivized_satisfaction = df_with_satisfaction[df_with_satisfaction['Incentivized']]['Overall_Satisfaction']
-        not_incentivized_satisfaction = df_with_satisfaction[~df_with_satisfaction['Incentivized']]['Overall_Satisfaction']
+    # Student satisfaction ratings by incentive type (sessions with satisfaction data)
+    satisfaction = df_completed['Overall_Satisfaction']
+    has_satisfaction = satisfaction.notna().to_numpy()
+    satisfaction_groups = {}
 
-        if len(incentivized_satisfaction) > 0:
-            satisfaction_ratings['incentivized'] = {
-                'mean': round(incentivized_satisfaction.mean(), 2),
-                'median': round(incentivized_satisfaction.median(), 2),
-                'std': round(incentivized_satisfaction.std(), 2),
-                'count': len(incentivized_satisfaction)
-            }
-
-        if len(not_incentivized_satisfaction) > 0:
-            satisfaction_ratings['not_incentivized'] = {
-                'mean': round(not_incentivized_satisfaction.mean(), 2),
-                'median': round(not_incentivized_satisfaction.median(), 2),
-                'std': round(not_incentivized_satisfaction.std(), 2),
-                'count': len(not_incentivized_satisfaction)
-            }
+    if has_satisfaction.any():
+        satisfaction_groups = {key: satisfaction[mask & has_satisfaction] for key, mask in incentive_groups}
 
-    metrics['satisfaction_rating_by_incentive'] = satisfaction_ratings
+    metrics['satisfaction_rating_by_incentive'] = {
+        key: _rating_summary(values) for key, values in satisfaction_groups.items() if len(values) > 0
+    }
 
     # Statistical testing (t-test for comparison)
-    from scipy import stats
-
-    statistical_tests = {}
-
-    # T-test: Incentivized vs Not Incentivized
-    if len(incentivized_ratings) >= 2 and len(not_incentivized_ratings) >= 2:
-        t_stat, p_value = stats.ttest_ind(incentivized_ratings, not_incentivized_ratings, equal_var=False)
-        statistical_tests['incentivized_vs_not'] = {
-            't_statistic': round(t_stat, 3),
-            'p_value': round(p_value, 4),
-            'significant_at_05': p_value < 0.05,
-            'significant_at_01': p_value < 0.01
-        }
-
-    # T-test: Class Required vs Not Required
-    if len(class_required_ratings) >= 2 and len(not_required_ratings) >= 2:
-        t_stat, p_value = stats.ttest_ind(class_required_ratings, not_required_ratings, equal_var=False)
-        statistical_tests['class_required_vs_not'] = {
-            't_statistic': round(t_stat, 3),
-            'p_value': round(p_value, 4),
-            'significant_at_05': p_value < 0.05,
-            'significant_at_01': p_value < 0.01
-        }
-
-    # T-test: Extra Credit vs No Extra Credit
-    if len(extra_credit_ratings) >= 2 and len(no_extra_credit_ratings) >= 2:
-        t_stat, p_value = stats.ttest_ind(extra_credit_ratings, no_extra_credit_ratings, equal_var=False)
-        statistical_tests['extra_credit_vs_not'] = {
-            't_statistic': round(t_stat, 3),
-            'p_value': round(p_value, 4),
-            'significant_at_05': p_value < 0.05,
-            'significant_at_01': p_value < 0.01
-        }
-
-    metrics['statistical_tests'] = statistical_tests
+    metrics['statistical_tests'] = _incentive_ttests(rating_groups)
 
     # Statistical tests for satisfaction ratings
-    satisfaction_tests = {}
-
-    if len(df_with_satisfaction) > 0:
-        # T-test: Incentivized vs Not Incentivized (satisfaction)
-        if len(incentivized_satisfaction) >= 2 and len(not_incentivized_satisfaction) >= 2:
-            t_stat, p_value = stats.ttest_ind(incentivized_satisfaction, not_incentivized_satisfaction, equal_var=False)
-            satisfaction_tests['incentivized_vs_not'] = {
-                't_statistic': round(t_stat, 3),
-                'p_value': round(p_value, 4),
-                'significant_at_05': p_value < 0.05,
-                'significant_at_01': p_value < 0.01
-            }
-
-        # T-test: Class Required vs Not Required (satisfaction)
-        if len(class_required_satisfaction) >= 2 and len(not_required_satisfaction) >= 2:
-            t_stat, p_value = stats.ttest_ind(class_required_satisfaction, not_required_satisfaction, equal_var=False)
-            satisfaction_tests['class_required_vs_not'] = {
-                't_statistic': round(t_stat, 3),
-                'p_value': round(p_value, 4),
-                'significant_at_05': p_value < 0.05,
-                'significant_at_01': p_value < 0.01
-            }
-
-        # T-test: Extra Credit vs No Extra Credit (satisfaction)
-        if len(extra_credit_satisfaction) >= 2 and len(no_extra_credit_satisfaction) >= 2:
-            t_stat, p_value = stats.ttest_ind(extra_credit_satisfaction, no_extra_credit_satisfaction, equal_var=False)
-            satisfaction_tests['extra_credit_vs_not'] = {
-                't_statistic': round(t_stat, 3),
-                'p_value': round(p_value, 4),
-                'significant_at_05': p_value < 0.05,
-                'significant_at_01': p_value < 0.01
-            }
-
-    metrics['satisfaction_statistical_tests'] = satisfaction_tests
+    metrics['satisfaction_statistical_tests'] = _incentive_ttests(satisfaction_groups)
 
     # Rating distribution by incentive status
     rating_dist = {}
 
-    if len(incentivized_ratings) > 0:
-        rating_dist['incentivized'] = incentivized_ratings.value_counts().sort_index().to_dict()
-
-    if len(not_incentivized_ratings) > 0:
-        rating_dist['not_incentivized'] = not_incentivized_ratings.value_counts().sort_index().to_dict()
+    for key in ('incentivized', 'not_incentivized'):
+        if len(rating_groups[key]) > 0:
+            rating_dist[key] = rating_groups[key].value_counts().sort_index().to_dict()
 
     metrics['rating_distribution'] = rating_dist
 
@@ -0,0 +1,26 @@
+# src/utils/text_matching.py
+
+import numpy as np
+import pandas as pd
+
+def contains_lower(series, pattern, regex=True):
+    """
+    Case-insensitive substring/regex flag for a text column.
+    
+    Same result as series.str.lower().str.contains(pattern, na=False, regex=regex),
+    but status-style columns only hold a handful of distinct values, so each
+    distinct value is lowercased and matched once and the flags are broadcast
+    back by code (missing values → False).
+    
+    Parameters:
+    - series: text or categorical Series
+    - pattern: substring or regex to look for (in lowercase)
+    - regex: treat pattern as a regular expression
+    
+    Returns:
+    - Boolean Series aligned with series
+    """
+    codes, uniques = pd.factorize(series)
+    matches = pd.Series(uniques).str.lower().str.contains(pattern, na=False, regex=regex)
+    flags = np.append(matches.to_numpy(dtype=bool), False)[codes]
+    return pd.Series(flags, index=series.index, name=series.name)
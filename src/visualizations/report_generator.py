@@ -531,14 +531,14 @@ def quick_report(file_path, output_path='writing_studio_report.pdf'):
         quick_report('penji_export.csv', 'report.pdf')
         quick_report('penji_export.xlsx', 'report.pdf')
     """
-    from src.core.data_cleaner import clean_data
+    from src.core.data_cleaner import clean_data, load_csv
     import pandas as pd
     
     # Load data (detect file type)
     if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
         df = pd.read_excel(file_path)
     else:
-        df = pd.read_csv(file_path)
+        df = load_csv(file_path)
     
     df_clean, log = clean_data(df, mode='scheduled', remove_outliers=True, log_actions=True)
     